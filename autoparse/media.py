@@ -0,0 +1,120 @@
+"""
+Media file serving.
+
+Uploaded files are handed off to the front-end server when one is
+configured (MEDIA_SENDFILE_BACKEND), so no Python worker is tied up
+streaming bytes. Without one, files are served with sendfile-backed
+FileResponse, HTTP Range support and conditional GET.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Content-addressed blobs never change once written. They include PAN and
+# Aadhaar images, so only the client may keep them, never a shared cache.
+IMMUTABLE_PREFIX = 'blobs/'
+
+
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid path')
+
+    filename = os.path.basename(full_path)
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    # Text-like blobs are stored gzipped by ContentAddressedStorage.
+    encoding = None
+    if not os.path.isfile(full_path) and os.path.isfile(full_path + '.gz'):
+        full_path += '.gz'
+        encoding = 'gzip'
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+
+    stat = os.stat(full_path)
+    etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        if encoding and 'gzip' not in request.headers.get('Accept-Encoding', ''):
+            response = FileResponse(gzip.open(full_path, 'rb'), content_type=content_type, filename=filename)
+        elif settings.MEDIA_SENDFILE_BACKEND:
+            response = sendfile_response(full_path, content_type)
+        elif encoding:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type, filename=filename)
+        else:
+            response = ranged_file_response(request, full_path, stat.st_size, content_type)
+
+        if encoding:
+            response['Content-Encoding'] = encoding
+            response['Vary'] = 'Accept-Encoding'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(int(stat.st_mtime))
+    if path.startswith(IMMUTABLE_PREFIX):
+        patch_cache_control(response, private=True, max_age=31536000, immutable=True)
+    return response
+
+
+def sendfile_response(full_path, content_type):
+    """Empty response telling nginx (X-Accel-Redirect) or Apache/lighttpd (X-Sendfile) to send the file."""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE_BACKEND == 'nginx':
+        relative = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        response['X-Accel-Redirect'] = settings.MEDIA_SENDFILE_PREFIX.rstrip('/') + '/' + relative
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+def ranged_file_response(request, full_path, size, content_type):
+    """Serve a whole file, or a single `Range: bytes=` slice of it with 206."""
+    match = RANGE_RE.match(request.headers.get('Range', '').strip())
+    if not match or request.method == 'HEAD':
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    elif last:
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        start, end = 0, -1
+
+    if start > end or start >= size:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    def read_range(chunk_size=64 * 1024):
+        with open(full_path, 'rb') as file:
+            file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    response = StreamingHttpResponse(read_range(), status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
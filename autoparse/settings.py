@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -81,9 +82,28 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so concurrent uploads
+            # queue for it instead of failing with "database is locked" on upgrade
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+
+CACHES = {
+    'default': {
+        # Local memory by default; point CACHE_BACKEND at
+        # django.core.cache.backends.filebased.FileBasedCache (with CACHE_LOCATION
+        # set to a directory) to share entries between gunicorn workers.
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'autoparse'),
     }
 }
 
+# Seconds a serialized candidate list/detail payload is kept in the cache
+CANDIDATE_CACHE_TIMEOUT = int(os.getenv('CANDIDATE_CACHE_TIMEOUT', '300'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,7 +145,8 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Whitenoise settings for static files
 STORAGES = {
     "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        # Uploads are stored once per distinct content and reference counted
+        "BACKEND": "candidates.storage.ContentAddressedStorage",
     },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -136,6 +157,92 @@ STORAGES = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Hand media downloads off to the front-end server instead of a Python worker:
+# 'nginx' sends X-Accel-Redirect to MEDIA_SENDFILE_PREFIX (an `internal`
+# location aliased to MEDIA_ROOT), 'apache' sends X-Sendfile. Leave empty to
+# serve from Django with sendfile-backed, range-capable responses.
+MEDIA_SENDFILE_BACKEND = os.getenv('MEDIA_SENDFILE_BACKEND', '')
+MEDIA_SENDFILE_PREFIX = os.getenv('MEDIA_SENDFILE_PREFIX', '/protected-media/')
+
+# Request threads per gunicorn worker (read by gunicorn.conf.py as well).
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Admission control: per-worker concurrency pools for expensive (upload /
+# request-documents / submit-documents) and cheap (read) endpoints. Requests
+# beyond `concurrency` wait in a queue of at most `queue` for up to `timeout`
+# seconds, and are otherwise rejected with 503 and Retry-After: `retry_after`.
+#
+# Running and queued requests each hold a gunicorn thread, so both pools
+# together must fit in GUNICORN_THREADS; anything beyond that waits in
+# gunicorn's own queue, where it is never rejected. By default uploads get
+# about a third of the threads and reads the rest.
+_expensive_concurrency = max(1, GUNICORN_THREADS // 4)
+_expensive_queue = max(1, GUNICORN_THREADS // 8)
+_cheap_queue = max(1, GUNICORN_THREADS // 8)
+_cheap_concurrency = max(1, GUNICORN_THREADS - _expensive_concurrency - _expensive_queue - _cheap_queue)
+
+ADMISSION_POOLS = {
+    'expensive': {
+        'concurrency': int(os.getenv('ADMISSION_EXPENSIVE_CONCURRENCY', str(_expensive_concurrency))),
+        'queue': int(os.getenv('ADMISSION_EXPENSIVE_QUEUE', str(_expensive_queue))),
+        'timeout': float(os.getenv('ADMISSION_EXPENSIVE_TIMEOUT', '30')),
+        'retry_after': 10,
+    },
+    'cheap': {
+        'concurrency': int(os.getenv('ADMISSION_CHEAP_CONCURRENCY', str(_cheap_concurrency))),
+        'queue': int(os.getenv('ADMISSION_CHEAP_QUEUE', str(_cheap_queue))),
+        'timeout': float(os.getenv('ADMISSION_CHEAP_TIMEOUT', '5')),
+        'retry_after': 1,
+    },
+}
+
+if sum(pool['concurrency'] + pool['queue'] for pool in ADMISSION_POOLS.values()) > GUNICORN_THREADS:
+    raise ImproperlyConfigured(
+        'ADMISSION_POOLS admit more requests (running + queued) than GUNICORN_THREADS can hold'
+    )
+
+# Per-client token buckets: `burst` requests up front, refilled at `rate` per
+# second. Exceeding it returns 429 with Retry-After. Clients are told apart by
+# authenticated user, else by IP address (see NUM_PROXIES below). Buckets live
+# in the default cache: with the per-process LocMem default each worker keeps
+# its own, so a client really gets up to burst x workers, and concurrent
+# requests can race on one bucket. Point CACHE_BACKEND at a shared cache
+# (e.g. FileBasedCache) to enforce one limit across workers.
+THROTTLE_BUCKETS = {
+    'expensive': {
+        'rate': float(os.getenv('THROTTLE_EXPENSIVE_RATE', '0.2')),
+        'burst': int(os.getenv('THROTTLE_EXPENSIVE_BURST', '10')),
+    },
+    'cheap': {
+        'rate': float(os.getenv('THROTTLE_CHEAP_RATE', '10')),
+        'burst': int(os.getenv('THROTTLE_CHEAP_BURST', '50')),
+    },
+}
+
+REST_FRAMEWORK = {
+    # Proxies in front of the app (Render's load balancer is one). DRF takes
+    # the client IP from that many hops back in X-Forwarded-For, so clients
+    # can't pick their own throttle bucket. Set to 0 when serving directly.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '1')),
+}
+
+# Idempotency-Key support for upload / request-documents (seconds)
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', str(24 * 60 * 60)))
+# How long a finished request keeps answering identical (same file) requests that overlapped it
+IDEMPOTENCY_COALESCE_TTL = int(os.getenv('IDEMPOTENCY_COALESCE_TTL', '5'))
+# How long a duplicate waits for the in-flight request before getting 409
+IDEMPOTENCY_WAIT_TIMEOUT = int(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', '120'))
+# In-flight claims older than this are treated as abandoned
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', '300'))
+
+# PAN/Aadhaar photo normalization (runs in a background thread pool after upload)
+DOCUMENT_PIPELINE_WORKERS = int(os.getenv('DOCUMENT_PIPELINE_WORKERS', '2'))
+DOCUMENT_IMAGE_MAX_SIZE = int(os.getenv('DOCUMENT_IMAGE_MAX_SIZE', '2000'))
+DOCUMENT_THUMBNAIL_SIZE = int(os.getenv('DOCUMENT_THUMBNAIL_SIZE', '320'))
+DOCUMENT_IMAGE_FORMAT = os.getenv('DOCUMENT_IMAGE_FORMAT', 'WEBP')
+DOCUMENT_IMAGE_QUALITY = int(os.getenv('DOCUMENT_IMAGE_QUALITY', '80'))
+KEEP_ORIGINAL_DOCUMENTS = os.getenv('KEEP_ORIGINAL_DOCUMENTS', 'False').lower() in ('true', '1', 't')
+
 # CORS settings
 # Allow all origins for now (configure CORS_ALLOWED_ORIGINS env var for specific domains)
 CORS_ALLOW_ALL_ORIGINS = True
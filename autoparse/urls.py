@@ -15,13 +15,12 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.http import JsonResponse
-import os
 
-from candidates.views import CandidateViewSet
+from autoparse.media import serve_media
+from candidates.views import CandidateViewSet, metrics
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -30,4 +29,6 @@ router.register(r'candidates', CandidateViewSet)
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('metrics', metrics),
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+]
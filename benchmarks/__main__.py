@@ -0,0 +1,217 @@
+"""
+End-to-end performance benchmarks for the candidates API.
+
+Runs each scenario against a throwaway SQLite database and media directory,
+with the Anthropic API replaced by a local fake server, and reports req/s,
+p50/p95/p99 latency, per-stage timings and peak RSS.
+
+    python -m benchmarks                                  # all scenarios, compare to baseline
+    python -m benchmarks --scenarios reads --iterations 200
+    python -m benchmarks --latency 0.8 --error-rate 0.05  # slow, flaky LLM
+    python -m benchmarks --save-baseline                  # record a new baseline
+
+Exits with status 1 when --fail-on-regression is given and any metric is
+worse than the baseline by more than --tolerance, or 2 when the baseline
+was recorded with different workload options (--iterations, --latency, ...)
+and so can't be compared. Worker cold start is
+measured separately by `python -m benchmarks.startup`.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from .corpus import build_corpus
+from .fake_anthropic import FakeAnthropicServer
+from .metrics import StageTimer, peak_rss_mb, reset_peak_rss, summarize
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+# metric -> True when higher is better
+COMPARED_METRICS = {'req_per_s': True, 'p50_ms': False, 'p95_ms': False, 'p99_ms': False}
+
+# Options that change the workload; runs are only comparable when these match
+WORKLOAD_OPTIONS = ('iterations', 'concurrency', 'latency', 'jitter', 'error_rate', 'seed')
+
+
+def parse_args(argv=None):
+    from .scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--iterations', type=int, default=30, help='requests (or resumes) per scenario')
+    parser.add_argument('--concurrency', type=int, default=3,
+                        help='client threads for bulk_upload (the default expensive pool admits 3 per worker)')
+    parser.add_argument('--latency', type=float, default=0.05, help='fake LLM latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random fake LLM latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of fake LLM calls that fail')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='write results to --baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--json', type=Path, help='also write the full report to this file')
+    return parser.parse_args(argv)
+
+
+def setup_django(workdir):
+    """Configure Django against a scratch database; returns a teardown callable."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'autoparse.settings')
+    import django
+    django.setup()
+
+    # Match production, where gunicorn.conf.py preloads these in the master,
+    # so the first upload isn't charged for importing them.
+    from candidates.services import preload_dependencies
+    preload_dependencies()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    # A file database (not the default shared in-memory one) so bulk_upload threads can write concurrently
+    connection.settings_dict.setdefault('TEST', {})['NAME'] = str(workdir / 'benchmark.sqlite3')
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return teardown
+
+
+def run_scenario(name, options, timer):
+    from .scenarios import SCENARIOS
+
+    timer.reset()
+    per_scenario_rss = reset_peak_rss()
+    with timer.instrument(), open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+        latencies, statuses, wall = SCENARIOS[name](options)
+
+    result = summarize(latencies)
+    result.update({
+        'requests': len(latencies),
+        'errors': sum(count for status, count in statuses.items() if status >= 400),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'wall_s': round(wall, 3),
+        'req_per_s': round(len(latencies) / wall, 2) if wall else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'peak_rss_scope': 'scenario' if per_scenario_rss else 'process',
+        'stages': timer.summary(),
+    })
+    return result
+
+
+def mismatched_options(options, baseline):
+    """Workload options that differ from the baseline's, as {option: (baseline, current)}."""
+    recorded = baseline.get('options', {})
+    return {
+        key: (recorded.get(key), options[key])
+        for key in WORKLOAD_OPTIONS
+        if recorded.get(key) != options[key]
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of (scenario, metric, baseline, current, change, regressed)."""
+    rows = []
+    for name, result in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = previous.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            regressed = -change > tolerance if higher_is_better else change > tolerance
+            rows.append((name, metric, before, after, change, regressed))
+    return rows
+
+
+def print_report(results, comparison):
+    for name, result in results.items():
+        scope = '' if result['peak_rss_scope'] == 'scenario' else ' (whole process)'
+        print(f"\n== {name}: {result['requests']} requests, {result['errors']} errors, "
+              f"{result['req_per_s']} req/s, peak RSS {result['peak_rss_mb']} MB{scope}")
+        print(f"   latency p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms")
+        for stage, stats in result['stages'].items():
+            print(f"   stage {stage:<12} n={stats['count']:<5} mean {stats['mean_ms']} ms  p95 {stats['p95_ms']} ms")
+
+    if comparison:
+        print('\n== Compared with baseline')
+        for name, metric, before, after, change, regressed in comparison:
+            flag = 'REGRESSION' if regressed else ''
+            print(f'   {name:<18} {metric:<10} {before:>10} -> {after:<10} {change:+.1%} {flag}')
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    options.corpus = build_corpus(max(options.iterations, 1), seed=options.seed)
+    # A separate set for bulk_upload, so it isn't answered by replays of single_upload
+    options.bulk_corpus = build_corpus(max(options.iterations, 1), seed=options.seed + options.iterations)
+
+    with tempfile.TemporaryDirectory(prefix='autoparse-bench-') as workdir, \
+            FakeAnthropicServer(options.latency, options.jitter, options.error_rate) as fake_llm:
+        workdir = Path(workdir)
+        os.environ['ANTHROPIC_BASE_URL'] = fake_llm.url
+        os.environ['ANTHROPIC_API_KEY'] = 'benchmark'
+        teardown = setup_django(workdir)
+        try:
+            from django.test.utils import override_settings
+
+            timer = StageTimer()
+            results = {}
+            # Every benchmark request comes from one client, so lift the per-client
+            # throttles; the admission pools stay as configured.
+            unthrottled = {scope: {'rate': 1e9, 'burst': 1e9} for scope in ('expensive', 'cheap')}
+            with override_settings(MEDIA_ROOT=str(workdir / 'media'), THROTTLE_BUCKETS=unthrottled):
+                for name in options.scenarios:
+                    results[name] = run_scenario(name, options, timer)
+        finally:
+            teardown()
+
+        llm_calls, llm_errors = fake_llm.request_count, fake_llm.error_count
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': sys.version.split()[0],
+        'options': {key: getattr(options, key) for key in WORKLOAD_OPTIONS},
+        'fake_llm': {'requests': llm_calls, 'injected_errors': llm_errors},
+        'scenarios': results,
+    }
+
+    baseline = {}
+    if options.baseline.exists() and not options.save_baseline:
+        baseline = json.loads(options.baseline.read_text())
+
+    mismatched = mismatched_options(report['options'], baseline) if baseline else {}
+    comparison = [] if mismatched else compare(results, baseline, options.tolerance)
+    print_report(results, comparison)
+    if mismatched:
+        print(f'\n== Not compared with {options.baseline}: it was recorded with different options')
+        for key, (before, after) in mismatched.items():
+            print(f'   {key:<12} baseline {before}, this run {after}')
+
+    if options.json:
+        options.json.write_text(json.dumps(report, indent=2) + '\n')
+    if options.save_baseline:
+        options.baseline.write_text(json.dumps(report, indent=2) + '\n')
+        print(f'\nBaseline written to {options.baseline}')
+
+    if options.fail_on_regression and mismatched:
+        # Can't tell regressions from a different workload; don't pass silently either
+        return 2
+    if options.fail_on_regression and any(row[-1] for row in comparison):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
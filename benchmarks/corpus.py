@@ -0,0 +1,165 @@
+"""
+Synthetic resume corpus.
+
+Generates PDF and DOCX resumes of different sizes and layouts from a seed,
+so benchmark runs are repeatable without shipping real candidate data.
+PDFs are written by hand (Helvetica text objects) so no PDF library is
+needed; DOCX files use python-docx, which the app already depends on.
+"""
+import io
+import random
+
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rohan', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rahul', 'Meera']
+LAST_NAMES = ['Sharma', 'Iyer', 'Patel', 'Reddy', 'Gupta', 'Nair', 'Singh', 'Menon', 'Das', 'Kapoor']
+EMPLOYERS = ['Infosys', 'TCS', 'Wipro', 'Flipkart', 'Zoho', 'Razorpay', 'Swiggy', 'Freshworks', 'HCL', 'Accenture']
+DESIGNATIONS = ['Software Engineer', 'Senior Software Engineer', 'Data Analyst', 'Product Manager',
+                'DevOps Engineer', 'QA Engineer', 'Frontend Developer', 'Backend Developer']
+SKILLS = ['Python', 'Django', 'JavaScript', 'React', 'Node.js', 'SQL', 'PostgreSQL', 'AWS', 'Docker',
+          'Kubernetes', 'Java', 'Spring Boot', 'Go', 'TypeScript', 'Machine Learning', 'Pandas', 'Git']
+FILLER = ('Delivered features end to end, worked closely with product and design, mentored junior '
+          'engineers, improved reliability and reduced latency across critical services.')
+
+# Number of experience entries per size
+SIZES = {'small': 2, 'medium': 8, 'large': 30}
+LAYOUTS = ['single', 'two-column', 'dense']
+
+
+def make_profile(rng, size):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    experience = []
+    for index in range(SIZES[size]):
+        experience.append({
+            'employer': rng.choice(EMPLOYERS),
+            'designation': rng.choice(DESIGNATIONS),
+            'years': f'{2024 - 2 * index - 2}-{2024 - 2 * index}',
+            'summary': ' '.join([FILLER] * rng.randint(1, 3)),
+        })
+    return {
+        'name': f'{first} {last}',
+        'email': f'{first.lower()}.{last.lower()}{rng.randint(1, 999)}@example.com',
+        'phone': f'+91-{rng.randint(70000, 99999)}-{rng.randint(10000, 99999)}',
+        'skills': rng.sample(SKILLS, rng.randint(4, 10)),
+        'experience': experience,
+    }
+
+
+def profile_lines(profile):
+    lines = [profile['name'], f"Email: {profile['email']}", f"Phone: {profile['phone']}", '',
+             'Skills: ' + ', '.join(profile['skills']), '', 'Experience']
+    for job in profile['experience']:
+        lines.append(f"{job['designation']} at {job['employer']} ({job['years']})")
+        # Wrap the summary so each PDF line stays on the page
+        words, line = job['summary'].split(), ''
+        for word in words:
+            if len(line) + len(word) > 90:
+                lines.append(line)
+                line = ''
+            line = f'{line} {word}'.strip()
+        lines.append(line)
+    return lines
+
+
+def pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(lines, layout):
+    """Minimal multi-page PDF with one Helvetica text object per line."""
+    font_size = 8 if layout == 'dense' else 10
+    leading = font_size + 3
+    columns = [50, 310] if layout == 'two-column' else [50]
+
+    pages, page, column, y = [], [], 0, 742
+    for line in lines:
+        if y < 50:
+            column += 1
+            y = 742
+            if column == len(columns):
+                pages.append(page)
+                page, column = [], 0
+        if line:
+            page.append(f'BT /F1 {font_size} Tf {columns[column]} {y} Td ({pdf_escape(line)}) Tj ET')
+        y -= leading
+    pages.append(page)
+
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for page in pages:
+        stream = '\n'.join(page).encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id)
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % kid for kid in kids), len(kids))
+
+    output = io.BytesIO()
+    output.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = output.tell()
+    output.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b'%010d 00000 n \n' % offset)
+    output.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+def build_docx(profile, layout):
+    import docx
+
+    document = docx.Document()
+    document.add_heading(profile['name'], level=1)
+    document.add_paragraph(f"Email: {profile['email']}")
+    document.add_paragraph(f"Phone: {profile['phone']}")
+
+    if layout == 'two-column':
+        # Skills on the left, experience on the right, as many templates do
+        table = document.add_table(rows=1, cols=2)
+        left, right = table.rows[0].cells
+        left.text = 'Skills: ' + ', '.join(profile['skills'])
+        right.text = '\n'.join(
+            f"{job['designation']} at {job['employer']} ({job['years']}): {job['summary']}"
+            for job in profile['experience']
+        )
+    else:
+        document.add_paragraph('Skills: ' + ', '.join(profile['skills']))
+        document.add_heading('Experience', level=2)
+        for job in profile['experience']:
+            document.add_paragraph(f"{job['designation']} at {job['employer']} ({job['years']})")
+            paragraph = document.add_paragraph(job['summary'])
+            if layout == 'dense':
+                paragraph.paragraph_format.space_after = 0
+
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def generate_resume(kind='pdf', size='small', layout='single', seed=0):
+    """Return (filename, bytes, profile) for one synthetic resume."""
+    rng = random.Random(f'{kind}-{size}-{layout}-{seed}')
+    profile = make_profile(rng, size)
+    if kind == 'pdf':
+        content = build_pdf(profile_lines(profile), layout)
+    elif kind == 'docx':
+        content = build_docx(profile, layout)
+    else:
+        raise ValueError(f'Unsupported resume kind: {kind}')
+    return f'resume_{size}_{layout}_{seed}.{kind}', content, profile
+
+
+def build_corpus(count, kinds=('pdf', 'docx'), sizes=tuple(SIZES), seed=0):
+    """A deterministic mix of `count` resumes cycling through kinds, sizes and layouts."""
+    corpus = []
+    for index in range(count):
+        kind = kinds[index % len(kinds)]
+        size = sizes[(index // len(kinds)) % len(sizes)]
+        layout = LAYOUTS[index % len(LAYOUTS)]
+        corpus.append(generate_resume(kind, size, layout, seed + index))
+    return corpus
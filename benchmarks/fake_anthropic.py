@@ -0,0 +1,141 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Serves POST /v1/messages on 127.0.0.1 with configurable latency and error
+injection, so upload and request-documents can be benchmarked without
+network access, API keys or spend. Point the app at it with
+ANTHROPIC_BASE_URL (the anthropic client reads it automatically).
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .corpus import SKILLS
+
+
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+')
+PHONE_RE = re.compile(r'\+?\d[\d -]{8,}\d')
+NAME_RE = re.compile(r'([A-Z][a-z]+ [A-Z][a-z]+)')
+
+
+def extract_fields(resume_text):
+    """Cheap regex 'extraction' that returns the same JSON shape the real prompt asks for."""
+    email = EMAIL_RE.search(resume_text)
+    phone = PHONE_RE.search(resume_text)
+    name = NAME_RE.search(resume_text)
+    skills = [skill for skill in SKILLS if skill in resume_text]
+    designation = re.search(r'([A-Z][\w ]+?) at ([A-Z]\w+)', resume_text)
+    fields = {
+        'name': name.group(1) if name else None,
+        'email': email.group(0) if email else None,
+        'phone': phone.group(0) if phone else None,
+        'employer': designation.group(2) if designation else None,
+        'designation': designation.group(1).strip() if designation else None,
+        'skills': ', '.join(skills) or None,
+    }
+    fields['confidence_scores'] = {key: 90 if value else 0 for key, value in fields.items()}
+    return fields
+
+
+class FakeAnthropicHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b'{}')
+
+        with server.lock:
+            server.request_count += 1
+
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        if not self.path.startswith('/v1/messages'):
+            return self.send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+
+        if server.error_rate and random.random() < server.error_rate:
+            with server.lock:
+                server.error_count += 1
+            return self.send_json(server.error_status, {
+                'type': 'error',
+                'error': {'type': 'overloaded_error', 'message': 'Overloaded (injected by benchmark)'},
+            })
+
+        prompt = request['messages'][0]['content']
+        if 'Resume text:' in prompt:
+            resume_text = prompt.split('Resume text:', 1)[1].split('Return only the JSON object', 1)[0]
+            text = json.dumps(extract_fields(resume_text))
+        else:
+            text = ('Dear Candidate, thank you for your application. Please share your PAN and Aadhaar '
+                    'cards through the candidate portal so we can complete verification. Best regards, HR Team')
+
+        self.send_json(200, {
+            'id': f'msg_fake_{server.request_count}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': request.get('model'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': len(prompt) // 4, 'output_tokens': len(text) // 4},
+        })
+
+
+class FakeAnthropicServer:
+    """
+    Context manager running the fake API in a background thread.
+
+    latency/jitter are in seconds; error_rate is the fraction of calls that
+    fail with error_status (529 "overloaded" by default, which the anthropic
+    client retries, just like in production).
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=529):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeAnthropicHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.jitter = jitter
+        self.httpd.error_rate = error_rate
+        self.httpd.error_status = error_status
+        self.httpd.request_count = 0
+        self.httpd.error_count = 0
+        self.httpd.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    @property
+    def error_count(self):
+        return self.httpd.error_count
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
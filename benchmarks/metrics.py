@@ -0,0 +1,116 @@
+import functools
+import importlib
+import math
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+# (module, class, method, stage name) wrapped with timers while a scenario runs
+STAGE_TARGETS = [
+    ('candidates.services', 'ResumeParser', 'parse_pdf', 'parse'),
+    ('candidates.services', 'ResumeParser', 'parse_docx', 'parse'),
+    ('candidates.services', 'ResumeParser', 'parse_doc', 'parse'),
+    ('candidates.services', 'ResumeParser', 'extract_fields_with_ai', 'llm_extract'),
+    ('candidates.services', 'AIDocumentRequestGenerator', 'generate_request', 'llm_request'),
+    ('candidates.storage', 'ContentAddressedStorage', '_save', 'storage'),
+]
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile; 0 for no samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        'count': len(samples),
+        'mean_ms': round(1000 * sum(samples) / len(samples), 3) if samples else 0.0,
+        'p50_ms': round(1000 * percentile(samples, 0.50), 3),
+        'p95_ms': round(1000 * percentile(samples, 0.95), 3),
+        'p99_ms': round(1000 * percentile(samples, 0.99), 3),
+        'total_ms': round(1000 * sum(samples), 3),
+    }
+
+
+def reset_peak_rss():
+    """
+    Start a new peak-RSS window, so each scenario reports its own peak.
+
+    Only Linux can reset the high-water mark (VmHWM, via clear_refs); returns
+    False elsewhere, where peak_rss_mb() stays the whole-process peak.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss_mb():
+    """Peak resident set size since the last reset_peak_rss(), else of the process so far."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+class StageTimer:
+    """Collects per-stage wall times from every thread while `instrument()` is active."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self.lock:
+            self.samples[stage].append(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.samples = defaultdict(list)
+
+    def summary(self):
+        with self.lock:
+            return {stage: summarize(samples) for stage, samples in sorted(self.samples.items())}
+
+    def wrap(self, stage, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+    @contextmanager
+    def instrument(self):
+        originals = []
+        for module_name, class_name, method_name, stage in STAGE_TARGETS:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            method = cls.__dict__[method_name]
+            originals.append((cls, method_name, method))
+            setattr(cls, method_name, self.wrap(stage, method))
+        try:
+            yield self
+        finally:
+            for cls, method_name, method in originals:
+                setattr(cls, method_name, method)
@@ -0,0 +1,120 @@
+"""
+Benchmark scenarios. Each one drives the API in-process through Django's
+test client and returns (latencies in seconds, status codes, wall time).
+Scenarios seed whatever candidates they need, so any subset can run alone.
+"""
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.test import Client
+
+
+def timed(call):
+    start = time.perf_counter()
+    response = call()
+    if getattr(response, 'streaming', False):
+        for _ in response.streaming_content:
+            pass
+    return time.perf_counter() - start, response
+
+
+def upload(client, resume):
+    name, content, _ = resume
+    return client.post('/api/candidates/upload/', {'resume': SimpleUploadedFile(name, content)}, secure=True)
+
+
+def seed_candidates(corpus):
+    """Insert one candidate per corpus profile directly, so a scenario doesn't depend on earlier uploads."""
+    from candidates.models import Candidate
+
+    return [
+        Candidate.objects.create(
+            name=profile['name'],
+            email=profile['email'],
+            phone=profile['phone'],
+            employer=profile['experience'][0]['employer'],
+            designation=profile['experience'][0]['designation'],
+            skills=', '.join(profile['skills']),
+        ).id
+        for _, _, profile in corpus
+    ]
+
+
+def run_sequential(calls):
+    latencies, statuses = [], Counter()
+    start = time.perf_counter()
+    for call in calls:
+        elapsed, response = timed(call)
+        latencies.append(elapsed)
+        statuses[response.status_code] += 1
+    return latencies, statuses, time.perf_counter() - start
+
+
+def single_upload(options):
+    client = Client()
+    corpus = options.corpus[:options.iterations]
+    return run_sequential([lambda resume=resume: upload(client, resume) for resume in corpus])
+
+
+def bulk_upload(options):
+    """Upload the corpus from `concurrency` threads at once, each with its own client and DB connection."""
+    corpus = options.bulk_corpus[:options.iterations]
+    batches = [corpus[index::options.concurrency] for index in range(options.concurrency)]
+
+    def worker(batch):
+        client = Client()
+        try:
+            return run_sequential([lambda resume=resume: upload(client, resume) for resume in batch])
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.concurrency) as pool:
+        results = list(pool.map(worker, batches))
+    wall = time.perf_counter() - start
+
+    latencies, statuses = [], Counter()
+    for batch_latencies, batch_statuses, _ in results:
+        latencies += batch_latencies
+        statuses += batch_statuses
+    return latencies, statuses, wall
+
+
+def reads(options):
+    """Mix of list, detail and conditional (If-None-Match) reads, as the polling frontend does."""
+    client = Client()
+    ids = seed_candidates(options.corpus[:options.iterations])
+    etags = {}
+
+    def read(path):
+        headers = {'HTTP_IF_NONE_MATCH': etags[path]} if path in etags else {}
+        response = client.get(path, secure=True, **headers)
+        if response.has_header('ETag'):
+            etags[path] = response['ETag']
+        return response
+
+    calls = []
+    for index in range(options.iterations):
+        calls.append(lambda: read('/api/candidates/'))
+        calls.append(lambda index=index: read(f'/api/candidates/{ids[index % len(ids)]}/'))
+    return run_sequential(calls)
+
+
+def request_documents(options):
+    client = Client()
+    ids = seed_candidates(options.corpus[:options.iterations])
+    return run_sequential([
+        lambda pk=pk: client.post(f'/api/candidates/{pk}/request-documents/', secure=True)
+        for pk in ids
+    ])
+
+
+SCENARIOS = {
+    'single_upload': single_upload,
+    'bulk_upload': bulk_upload,
+    'reads': reads,
+    'request_documents': request_documents,
+}
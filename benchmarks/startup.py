@@ -0,0 +1,138 @@
+"""
+Worker cold-start benchmark.
+
+Boots the app the way a gunicorn worker does (Django setup, WSGI handler,
+URL conf) in fresh interpreters under `python -X importtime`, and reports
+boot time, total import time, the slowest top-level imports, resident
+memory per worker and which heavy dependencies got loaded. The `preloaded`
+variant also runs candidates.services.preload_dependencies(), i.e. what a
+worker costs when nothing is shared with the master.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --top 15
+    python -m benchmarks.startup --save-baseline
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'startup_baseline.json'
+
+HEAVY_MODULES = ['anthropic', 'httpx', 'pydantic', 'PyPDF2', 'docx', 'PIL']
+
+# Lower is better for every compared metric
+COMPARED_METRICS = ['startup_ms', 'import_ms', 'rss_mb']
+
+BOOT_SCRIPT = r'''
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'autoparse.settings')
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+import autoparse.urls
+if sys.argv[1] == 'preloaded':
+    from candidates.services import preload_dependencies
+    preload_dependencies()
+elapsed = time.perf_counter() - start
+
+rss_kb = 0
+if os.path.exists('/proc/self/status'):
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                rss_kb = int(line.split()[1])
+if not rss_kb:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'startup_ms': elapsed * 1000,
+    'rss_mb': rss_kb / 1024,
+    'loaded': [name for name in sys.argv[2:] if name in sys.modules],
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """Return (total self time in ms, {top-level module: cumulative ms}) from -X importtime output."""
+    total_us, top_level = 0, {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        total_us += int(self_us)
+        if not name[1:].startswith(' '):
+            top_level[name.strip()] = int(cumulative_us) / 1000
+    return total_us / 1000, top_level
+
+
+def boot_once(variant):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT, variant, *HEAVY_MODULES],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample['import_ms'], sample['imports'] = parse_importtime(result.stderr)
+    return sample
+
+
+def measure(variant, runs, top):
+    samples = [boot_once(variant) for _ in range(runs)]
+    slowest = samples[-1]['imports']
+    return {
+        'runs': runs,
+        'startup_ms': round(statistics.median(s['startup_ms'] for s in samples), 1),
+        'import_ms': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'rss_mb': round(statistics.median(s['rss_mb'] for s in samples), 1),
+        'heavy_modules_loaded': samples[-1]['loaded'],
+        'slowest_imports_ms': dict(sorted(slowest.items(), key=lambda item: -item[1])[:top]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per variant (median is reported)')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest top-level imports to list')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    options = parser.parse_args(argv)
+
+    results = {variant: measure(variant, options.runs, options.top) for variant in ('lazy', 'preloaded')}
+
+    for variant, result in results.items():
+        print(f"\n== {variant}: boot {result['startup_ms']} ms, imports {result['import_ms']} ms, "
+              f"RSS {result['rss_mb']} MB")
+        print(f"   heavy modules loaded: {', '.join(result['heavy_modules_loaded']) or 'none'}")
+        for name, ms in result['slowest_imports_ms'].items():
+            print(f'   {ms:>9.1f} ms  {name}')
+
+    regressed = False
+    if options.baseline.exists() and not options.save_baseline:
+        baseline = json.loads(options.baseline.read_text()).get('variants', {})
+        print('\n== Compared with baseline')
+        for variant, result in results.items():
+            for metric in COMPARED_METRICS:
+                before, after = baseline.get(variant, {}).get(metric), result[metric]
+                if not before:
+                    continue
+                change = (after - before) / before
+                flag = 'REGRESSION' if change > options.tolerance else ''
+                regressed |= bool(flag)
+                print(f'   {variant:<10} {metric:<11} {before:>8} -> {after:<8} {change:+.1%} {flag}')
+
+    if options.save_baseline:
+        report = {'python': sys.version.split()[0], 'variants': results}
+        options.baseline.write_text(json.dumps(report, indent=2) + '\n')
+        print(f'\nBaseline written to {options.baseline}')
+
+    return 1 if options.fail_on_regression and regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
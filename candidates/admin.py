@@ -1,10 +1,40 @@
 from django.contrib import admin
-from .models import Candidate
+from .models import Candidate, Facet
 # Register your models here.
 
+
+class FacetListFilter(admin.SimpleListFilter):
+    """List filter whose choices come from the facet counts instead of a DISTINCT scan."""
+    facet_kind = None
+    lookup_limit = 50
+
+    def lookups(self, request, model_admin):
+        facets = Facet.objects.filter(kind=self.facet_kind, count__gt=0).order_by('-count', 'label')
+        return [(facet.value, f'{facet.label} ({facet.count})') for facet in facets[:self.lookup_limit]]
+
+
+class EmployerFacetFilter(FacetListFilter):
+    title = 'employer'
+    parameter_name = 'employer_facet'
+    facet_kind = Facet.EMPLOYER
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(employer_key=self.value())
+        return queryset
+
+
 @admin.register(Candidate)
 class CandidateAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'phone', 'employer', 'created_at', 'updated_at']
-    list_filter = ['employer', 'created_at', 'updated_at']
+    list_filter = [EmployerFacetFilter, 'created_at', 'updated_at']
     search_fields = ['name', 'email', 'phone']
-    ordering = ['-created_at']
\ No newline at end of file
+    ordering = ['-created_at']
+
+
+@admin.register(Facet)
+class FacetAdmin(admin.ModelAdmin):
+    list_display = ['label', 'kind', 'value', 'count']
+    list_filter = ['kind']
+    search_fields = ['label', 'value']
+    ordering = ['kind', '-count']
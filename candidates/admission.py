@@ -0,0 +1,213 @@
+"""
+Admission control for the candidates API.
+
+Two layers protect the workers and the Anthropic quota:
+
+* Per-client token-bucket throttles (DRF throttle classes) reject clients
+  that exceed their rate with 429 and Retry-After before any work is done.
+* Per-process concurrency pools cap how many expensive (parse/LLM/upload)
+  and cheap (read) requests run at once. Requests over the cap wait in a
+  bounded queue; when the queue is full or the wait times out they get 503
+  and Retry-After instead of piling up behind the busy ones.
+
+Queue depth, admissions and rejections are exported in Prometheus text
+format by `render_metrics()` (served at /metrics).
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import BaseThrottle
+
+
+# Viewset actions that parse files or call the LLM
+EXPENSIVE_ACTIONS = {'upload', 'request_documents', 'submit_documents'}
+
+_throttled = defaultdict(int)
+_throttled_lock = threading.Lock()
+
+
+def pool_name_for(action):
+    return 'expensive' if action in EXPENSIVE_ACTIONS else 'cheap'
+
+
+class ServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server is busy, please retry later.'
+    default_code = 'service_unavailable'
+
+    def __init__(self, wait, detail=None):
+        # DRF's exception handler turns `wait` into a Retry-After header.
+        self.wait = wait
+        super().__init__(detail)
+
+
+class AdmissionPool:
+    """At most `concurrency` requests run at once; up to `queue` more may wait `timeout` seconds."""
+
+    def __init__(self, name, concurrency, queue, timeout, retry_after):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = defaultdict(int)
+
+    def acquire(self):
+        with self.condition:
+            if self.active >= self.concurrency:
+                if self.waiting >= self.queue:
+                    self.rejected['queue_full'] += 1
+                    raise ServiceUnavailable(self.retry_after)
+
+                self.waiting += 1
+                try:
+                    admitted = self.condition.wait_for(lambda: self.active < self.concurrency, self.timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.rejected['timeout'] += 1
+                    raise ServiceUnavailable(self.retry_after)
+
+            self.active += 1
+            self.admitted += 1
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name):
+    """Pools are built from ADMISSION_POOLS on first use, once per worker process."""
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = AdmissionPool(name, **settings.ADMISSION_POOLS[name])
+        return _pools[name]
+
+
+class AdmissionControlMixin:
+    """Runs each viewset request inside the concurrency pool for its action."""
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication, permissions and throttles first, so throttled clients never queue
+        super().initial(request, *args, **kwargs)
+        pool = get_pool(pool_name_for(self.action))
+        pool.acquire()
+        self.admission_pool = pool
+
+    @property
+    def admission_timeout(self):
+        """How long this request may hold its slot waiting on another request's work."""
+        return self.admission_pool.timeout if self.admission_pool is not None else None
+
+    def dispatch(self, request, *args, **kwargs):
+        self.admission_pool = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self.admission_pool is not None:
+                self.admission_pool.release()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per client (authenticated user, otherwise IP address).
+
+    Each client gets `burst` requests up front, refilled at `rate` per
+    second, as configured under this throttle's scope in THROTTLE_BUCKETS.
+    Bucket state lives in the default cache and is read and written without
+    a lock, so the limit holds per cache (per worker with LocMem) and
+    concurrent requests may occasionally both take the last token.
+    """
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_client_ident(self, request):
+        # Only credentials an authentication class has checked count; a raw
+        # Authorization header is client-chosen and would mint fresh buckets.
+        # get_ident() honours NUM_PROXIES, so X-Forwarded-For can't be spoofed either.
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return 'ip:' + self.get_ident(request)
+
+    def allow_request(self, request, view):
+        rate = settings.THROTTLE_BUCKETS[self.scope]['rate']
+        burst = settings.THROTTLE_BUCKETS[self.scope]['burst']
+        key = f'throttle:{self.scope}:{self.get_client_ident(request)}'
+
+        now = time.time()
+        tokens, updated = cache.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / rate
+            cache.set(key, (tokens, now), math.ceil(burst / rate))
+            with _throttled_lock:
+                _throttled[self.scope] += 1
+            return False
+
+        cache.set(key, (tokens - 1, now), math.ceil(burst / rate))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ExpensiveRateThrottle(TokenBucketThrottle):
+    scope = 'expensive'
+
+
+class CheapRateThrottle(TokenBucketThrottle):
+    scope = 'cheap'
+
+
+def render_metrics():
+    """Prometheus text exposition of this worker's admission state."""
+    pools = [get_pool(name) for name in settings.ADMISSION_POOLS]
+    lines = [
+        '# HELP autoparse_admission_in_flight Requests currently running, per pool (this worker).',
+        '# TYPE autoparse_admission_in_flight gauge',
+    ]
+    lines += [f'autoparse_admission_in_flight{{pool="{pool.name}"}} {pool.active}' for pool in pools]
+    lines += [
+        '# HELP autoparse_admission_queue_depth Requests waiting for a slot, per pool (this worker).',
+        '# TYPE autoparse_admission_queue_depth gauge',
+    ]
+    lines += [f'autoparse_admission_queue_depth{{pool="{pool.name}"}} {pool.waiting}' for pool in pools]
+    lines += [
+        '# HELP autoparse_admission_admitted_total Requests admitted, per pool.',
+        '# TYPE autoparse_admission_admitted_total counter',
+    ]
+    lines += [f'autoparse_admission_admitted_total{{pool="{pool.name}"}} {pool.admitted}' for pool in pools]
+    lines += [
+        '# HELP autoparse_admission_rejected_total Requests rejected with 503, per pool and reason.',
+        '# TYPE autoparse_admission_rejected_total counter',
+    ]
+    for pool in pools:
+        for reason in ('queue_full', 'timeout'):
+            lines.append(
+                f'autoparse_admission_rejected_total{{pool="{pool.name}",reason="{reason}"}} {pool.rejected[reason]}'
+            )
+    lines += [
+        '# HELP autoparse_throttled_total Requests rejected with 429 by the per-client token bucket.',
+        '# TYPE autoparse_throttled_total counter',
+    ]
+    with _throttled_lock:
+        lines += [f'autoparse_throttled_total{{scope="{scope}"}} {count}' for scope, count in sorted(_throttled.items())]
+    return '\n'.join(lines) + '\n'
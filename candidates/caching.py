@@ -0,0 +1,69 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import TableVersion
+
+
+CANDIDATE_TABLE = 'candidate'
+
+
+def get_table_version(name=CANDIDATE_TABLE):
+    """Return (version, last_modified) for a table; (0, None) before its first write."""
+    row = TableVersion.objects.filter(name=name).values_list('version', 'updated_at').first()
+    if row is None:
+        return 0, None
+    return row
+
+
+def bump_table_version(name=CANDIDATE_TABLE):
+    """Atomically increment the table counter so every cached list payload goes stale."""
+    now = timezone.now()
+    updated = TableVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=now)
+    if not updated:
+        TableVersion.objects.get_or_create(name=name, defaults={'version': 1, 'updated_at': now})
+
+
+def make_etag(request, *parts):
+    """
+    Build a strong ETag from the resource version plus everything else the
+    rendered body depends on: the host (file URLs are absolute), the query
+    string and the negotiated media type.
+    """
+    raw = ':'.join(str(part) for part in parts + (
+        request.build_absolute_uri(),
+        getattr(request, 'accepted_media_type', ''),
+    ))
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def cached_response(request, etag, last_modified, build_payload, respond):
+    """
+    Answer a read with 304 when the client's copy is current, otherwise serve
+    the serialized payload from the cache (building it on a miss).
+
+    The ETag doubles as the cache key, so a write that changes the version or
+    `updated_at` makes old entries unreachable; they simply age out.
+    """
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+    if response is None:
+        key = 'candidates:payload:' + etag.strip('"')
+        payload = cache.get(key)
+        if payload is None:
+            payload = build_payload()
+            cache.set(key, payload, settings.CANDIDATE_CACHE_TIMEOUT)
+        response = respond(payload)
+
+    response['ETag'] = etag
+    if last_modified_ts is not None:
+        response['Last-Modified'] = http_date(last_modified_ts)
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ['Accept'])
+    return response
@@ -0,0 +1,141 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+
+from .models import Candidate
+from .storage import release_file
+
+
+# Identity document fields that go through the image pipeline
+DOCUMENT_FIELDS = ['pan_card', 'aadhar_card']
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide worker pool, created on first use so forked workers each get their own."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DOCUMENT_PIPELINE_WORKERS,
+                thread_name_prefix='document-pipeline',
+            )
+        return _executor
+
+
+def schedule_normalization(candidate_id, field_names):
+    """Queue the uploaded documents for normalization once the current transaction commits."""
+    def submit():
+        get_executor().submit(run_normalization, candidate_id, list(field_names))
+
+    transaction.on_commit(submit)
+
+
+def run_normalization(candidate_id, field_names):
+    try:
+        normalize_documents(candidate_id, field_names)
+    except Exception as e:
+        print(f"Error normalizing documents for candidate {candidate_id}: {type(e).__name__}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        # Worker threads open their own connections; don't leak them.
+        connections.close_all()
+
+
+def encode_image(image, max_size):
+    """Downscale an image to fit in max_size x max_size and re-encode it without metadata."""
+    image = image.copy()
+    image.thumbnail((max_size, max_size))
+
+    image_format = settings.DOCUMENT_IMAGE_FORMAT.upper()
+    if image.mode not in ('RGB', 'RGBA', 'L') or (image_format == 'JPEG' and image.mode == 'RGBA'):
+        image = image.convert('RGB')
+
+    output = io.BytesIO()
+    # No exif=/icc_profile= arguments, so none of the camera metadata is written back.
+    image.save(output, format=image_format, quality=settings.DOCUMENT_IMAGE_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def normalize_image(file):
+    """
+    Return (normalized bytes, thumbnail bytes) for an uploaded photo, or None
+    if the file is not an image Pillow can read (e.g. a scanned PDF).
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(file)
+    except UnidentifiedImageError:
+        return None
+
+    with image:
+        max_size = settings.DOCUMENT_IMAGE_MAX_SIZE
+        # Let the JPEG decoder skip detail we are about to throw away.
+        image.draft('RGB', (max_size, max_size))
+        # Apply the camera's orientation before the EXIF block is dropped.
+        image = ImageOps.exif_transpose(image)
+        return (
+            encode_image(image, max_size),
+            encode_image(image, settings.DOCUMENT_THUMBNAIL_SIZE),
+        )
+
+
+def normalize_documents(candidate_id, field_names):
+    """Replace uploaded PAN/Aadhaar photos with downscaled, metadata-free copies plus thumbnails."""
+    candidate = Candidate.objects.filter(pk=candidate_id).first()
+    if candidate is None:
+        return
+
+    extension = '.' + settings.DOCUMENT_IMAGE_FORMAT.lower()
+    results = {}
+    for field_name in field_names:
+        field_file = getattr(candidate, field_name)
+        if not field_file:
+            continue
+
+        with field_file.open('rb') as file:
+            images = normalize_image(file)
+        if images is None:
+            continue
+
+        stem = os.path.splitext(os.path.basename(field_file.name))[0]
+        storage = field_file.storage
+        thumbnail_field = Candidate._meta.get_field(f'{field_name}_thumbnail')
+        results[field_name] = (
+            field_file.name,
+            storage.save(field_file.field.generate_filename(candidate, stem + extension), ContentFile(images[0])),
+            storage.save(thumbnail_field.generate_filename(candidate, stem + extension), ContentFile(images[1])),
+        )
+
+    if not results:
+        return
+
+    with transaction.atomic():
+        candidate = Candidate.objects.select_for_update().get(pk=candidate_id)
+        update_fields = ['updated_at']
+        for field_name, (original, normalized, thumbnail) in results.items():
+            if getattr(candidate, field_name).name != original:
+                # Replaced by a newer upload while we were working; that upload has its own job.
+                storage = getattr(candidate, field_name).storage
+                release_file(storage, normalized)
+                release_file(storage, thumbnail)
+                continue
+
+            setattr(candidate, field_name, normalized)
+            setattr(candidate, f'{field_name}_thumbnail', thumbnail)
+            update_fields += [field_name, f'{field_name}_thumbnail']
+            if settings.KEEP_ORIGINAL_DOCUMENTS:
+                setattr(candidate, f'{field_name}_original', original)
+                update_fields.append(f'{field_name}_original')
+
+        # Files no longer referenced (the original, unless kept) are released by the save signals.
+        candidate.save(update_fields=update_fields)
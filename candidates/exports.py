@@ -0,0 +1,50 @@
+import csv
+import json
+
+from .serializers import CandidateSerializer
+
+
+# Rows are pulled from the database in batches of this size, so memory use
+# stays flat no matter how many candidates are exported.
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_FIELDS = CandidateSerializer.Meta.fields
+
+
+class Echo:
+    """File-like object that hands back whatever is written to it, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(queryset, since=None):
+    """Order candidates by `updated_at` so `since` can be used as a resume cursor."""
+    if since is not None:
+        queryset = queryset.filter(updated_at__gt=since)
+    return queryset.order_by('updated_at', 'id')
+
+
+def iter_rows(queryset, request=None):
+    """Yield serialized candidates one at a time from a chunked iterator."""
+    context = {'request': request}
+    for candidate in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield CandidateSerializer(candidate, context=context).data
+
+
+def stream_ndjson(queryset, request=None):
+    for row in iter_rows(queryset, request):
+        yield json.dumps(row, default=str) + '\n'
+
+
+def stream_csv(queryset, request=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in iter_rows(queryset, request):
+        values = []
+        for field in EXPORT_FIELDS:
+            value = row.get(field)
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            values.append('' if value is None else value)
+        yield writer.writerow(values)
@@ -0,0 +1,158 @@
+"""
+Skill, employer and designation facets.
+
+Facet rows hold a running count of candidates per normalized value and are
+adjusted by the Candidate save/delete signals, so facet queries read a
+handful of rows instead of scanning (and, for skills, string-splitting)
+the whole candidate table. `rebuild_facets()` recomputes them from scratch.
+"""
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Facet
+
+
+FACET_FIELDS = ['skills', 'employer', 'designation']
+
+SKILL_SEPARATORS = re.compile(r'[,;|\n]+')
+WHITESPACE = re.compile(r'\s+')
+
+# Spellings folded into one skill token (keys and values are normalized)
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'java script': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'node js': 'node.js',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'amazon web services': 'aws',
+    'c sharp': 'c#',
+    'springboot': 'spring boot',
+}
+
+# Display labels for the tokens aliases fold into, so a facet isn't shown
+# with whichever spelling ("JS", "k8s") its first candidate happened to use
+SKILL_LABELS = {
+    'javascript': 'JavaScript',
+    'typescript': 'TypeScript',
+    'python': 'Python',
+    'go': 'Go',
+    'react': 'React',
+    'node.js': 'Node.js',
+    'postgresql': 'PostgreSQL',
+    'kubernetes': 'Kubernetes',
+    'machine learning': 'Machine Learning',
+    'aws': 'AWS',
+    'c#': 'C#',
+    'spring boot': 'Spring Boot',
+}
+
+
+def normalize(value):
+    """Case-fold and collapse whitespace; None for blank values."""
+    if not value:
+        return None
+    value = WHITESPACE.sub(' ', value).strip().strip('.').strip()
+    return value.casefold() or None
+
+
+def skill_tokens(skills):
+    """{normalized token: display label} for a comma-separated skills string."""
+    tokens = {}
+    for raw in SKILL_SEPARATORS.split(skills or ''):
+        value = normalize(raw)
+        if value is None:
+            continue
+        value = SKILL_ALIASES.get(value, value)[:255]
+        tokens.setdefault(value, SKILL_LABELS.get(value) or WHITESPACE.sub(' ', raw).strip())
+    return tokens
+
+
+def facet_values(skills, employer, designation):
+    """{(kind, value): label} contributed by one candidate."""
+    values = {(Facet.SKILL, token): label for token, label in skill_tokens(skills).items()}
+    for kind, raw in ((Facet.EMPLOYER, employer), (Facet.DESIGNATION, designation)):
+        value = facet_key(raw)
+        if value is not None:
+            values[(kind, value)] = WHITESPACE.sub(' ', raw).strip()
+    return values
+
+
+def candidate_facets(candidate):
+    return facet_values(candidate.skills, candidate.employer, candidate.designation)
+
+
+def apply_delta(previous, current):
+    """Move facet counts from one candidate state to another; both are facet_values() dicts."""
+    delta = Counter(current.keys())
+    delta.subtract(previous.keys())
+    changes = {key: count for key, count in delta.items() if count}
+    if not changes:
+        return
+
+    labels = {**previous, **current}
+    with transaction.atomic():
+        for (kind, value), count in changes.items():
+            facets = Facet.objects.filter(kind=kind, value=value)
+            if count < 0:
+                # The last candidate with this value is gone: drop the row rather than keep a zero
+                if not facets.filter(count__gt=-count).update(count=F('count') + count):
+                    facets.delete()
+                continue
+
+            if not facets.update(count=F('count') + count):
+                facet, created = Facet.objects.get_or_create(
+                    kind=kind, value=value, defaults={'label': labels[(kind, value)][:255], 'count': count}
+                )
+                if not created:
+                    facets.update(count=F('count') + count)
+
+
+def top_facets(kind, limit=20):
+    return list(
+        Facet.objects.filter(kind=kind, count__gt=0)
+        .order_by('-count', 'label')
+        .values('value', 'label', 'count')[:limit]
+    )
+
+
+def facet_key(raw):
+    """The Facet.value a raw employer/designation string is counted under, or None."""
+    value = normalize(raw)
+    return value[:255] if value is not None else None
+
+
+def rebuild_facets():
+    """Recompute every facet from the candidate table."""
+    from .models import Candidate
+
+    counts, labels = Counter(), {}
+    rows = Candidate.objects.values_list(*FACET_FIELDS).iterator(chunk_size=1000)
+    for skills, employer, designation in rows:
+        values = facet_values(skills, employer, designation)
+        counts.update(values.keys())
+        for key, label in values.items():
+            labels.setdefault(key, label)
+
+    with transaction.atomic():
+        Facet.objects.all().delete()
+        Facet.objects.bulk_create(
+            [
+                Facet(kind=kind, value=value, label=labels[(kind, value)][:255], count=count)
+                for (kind, value), count in counts.items()
+            ],
+            batch_size=1000,
+        )
+    return len(counts)
@@ -0,0 +1,191 @@
+"""
+Idempotency keys and in-flight request coalescing.
+
+A request is identified by a key (the client's `Idempotency-Key` header, or
+a content key such as the uploaded file's hash). The first request with a
+key claims an IdempotencyKey row and does the work; concurrent requests
+with the same key wait for it (on a threading.Event in the same process,
+by polling the row across processes) and get the same response. Completed
+responses are replayed until the row expires.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 200
+POLL_INTERVAL = 0.1
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request."""
+
+
+class IdempotencyTimeout(Exception):
+    """The request holding the key did not finish within IDEMPOTENCY_WAIT_TIMEOUT."""
+
+
+class InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def claim(key, fingerprint):
+    """Try to become the request that computes `key`; returns (claimed, record)."""
+    now = timezone.now()
+    # Drops replays past their TTL, and in-flight claims older than
+    # IDEMPOTENCY_LOCK_TIMEOUT whose request died without cleaning up.
+    IdempotencyKey.objects.filter(expires_at__lt=now).delete()
+
+    try:
+        with transaction.atomic():
+            record = IdempotencyKey.objects.create(
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT),
+            )
+        return True, record
+    except IntegrityError:
+        return False, IdempotencyKey.objects.filter(key=key).first()
+
+
+def execute(key, fingerprint, compute, ttl, deadline=None):
+    """
+    Run `compute()` (returning (status, data)) at most once per key at a time.
+
+    Returns (status, data, replayed). Server errors are not stored, so a retry
+    after a 5xx runs the work again. Waiting for another request holding the
+    key gives up at `deadline` (time.monotonic()), by default
+    IDEMPOTENCY_WAIT_TIMEOUT from now.
+    """
+    if deadline is None:
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    record = None
+    while True:
+        if record is None:
+            claimed, record = claim(key, fingerprint)
+        else:
+            claimed = False
+
+        if claimed:
+            with _in_flight_lock:
+                in_flight = _in_flight[key] = InFlight()
+            try:
+                result = compute()
+                if result[0] < 500:
+                    completed_at = timezone.now()
+                    IdempotencyKey.objects.filter(pk=record.pk).update(
+                        response_status=result[0],
+                        response_body=result[1],
+                        completed_at=completed_at,
+                        expires_at=completed_at + timedelta(seconds=ttl),
+                    )
+                else:
+                    record.delete()
+                in_flight.result = result
+                return result[0], result[1], False
+            except BaseException:
+                IdempotencyKey.objects.filter(pk=record.pk).delete()
+                raise
+            finally:
+                with _in_flight_lock:
+                    _in_flight.pop(key, None)
+                in_flight.event.set()
+
+        if record is not None:
+            if record.fingerprint != fingerprint:
+                raise IdempotencyConflict(key)
+            if record.response_status is not None:
+                return record.response_status, record.response_body, True
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise IdempotencyTimeout(key)
+
+        with _in_flight_lock:
+            in_flight = _in_flight.get(key)
+        if in_flight is not None:
+            in_flight.event.wait(remaining)
+            if in_flight.result is not None:
+                return in_flight.result[0], in_flight.result[1], True
+        else:
+            time.sleep(min(POLL_INTERVAL, remaining))
+
+        # Poll with a plain read; claim() writes, and under IMMEDIATE transactions
+        # every write attempt would contend with real uploads for the SQLite lock.
+        # Only try to claim again once the holder's row is gone or abandoned.
+        record = IdempotencyKey.objects.filter(key=key, expires_at__gte=timezone.now()).first()
+
+
+def idempotent_response(request, scope, fingerprint, handler, coalesce_key=None, wait_timeout=None):
+    """
+    Wrap a view body so retries and duplicate concurrent calls share one execution.
+
+    `handler()` returns a DRF Response. With an Idempotency-Key header the
+    response is stored for IDEMPOTENCY_KEY_TTL and replayed to retries; the
+    same fingerprint must accompany every use of a key. Requests with the same
+    `coalesce_key` (e.g. the same file) that overlap in time share one
+    execution whether or not they carry a key.
+
+    A duplicate waits at most `wait_timeout` seconds (capped at
+    IDEMPOTENCY_WAIT_TIMEOUT) before getting 409. Views under admission
+    control pass their pool's timeout, since the waiting request keeps its slot.
+    """
+    timeout = settings.IDEMPOTENCY_WAIT_TIMEOUT
+    if wait_timeout is not None:
+        timeout = min(timeout, wait_timeout)
+    deadline = time.monotonic() + timeout
+
+    def run():
+        response = handler()
+        return response.status_code, response.data
+
+    def run_coalesced():
+        if coalesce_key is None:
+            return run() + (False,)
+        content_key = f'{scope}:content:{coalesce_key}'
+        return execute(content_key, fingerprint, run, settings.IDEMPOTENCY_COALESCE_TTL, deadline)
+
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is not None and not 0 < len(key) <= MAX_KEY_LENGTH:
+        return Response({
+            'error': f'{IDEMPOTENCY_HEADER} must be between 1 and {MAX_KEY_LENGTH} characters'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        if key is not None:
+            response_status, data, replayed = execute(
+                f'{scope}:key:{key}', fingerprint, lambda: run_coalesced()[:2], settings.IDEMPOTENCY_KEY_TTL,
+                deadline,
+            )
+        else:
+            response_status, data, replayed = run_coalesced()
+    except IdempotencyConflict:
+        return Response({
+            'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'
+        }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    except IdempotencyTimeout:
+        response = Response({
+            'error': 'An identical request is still being processed, retry later'
+        }, status=status.HTTP_409_CONFLICT)
+        response['Retry-After'] = '5'
+        return response
+
+    response = Response(data, status=response_status)
+    if replayed:
+        response['Idempotent-Replayed'] = 'true'
+    return response
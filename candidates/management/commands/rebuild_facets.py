@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from candidates.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Recompute skill/employer/designation facet counts from the candidate table.'
+
+    def handle(self, *args, **options):
+        count = rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} facets'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0003_candidate_confidence_scores'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+    ]
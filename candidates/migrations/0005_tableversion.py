@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0004_candidate_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0005_tableversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('size', models.BigIntegerField(default=0)),
+                ('compressed', models.BooleanField(default=False)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0006_storedblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='aadhar_card_original',
+            field=models.FileField(blank=True, null=True, upload_to='originals/'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='aadhar_card_thumbnail',
+            field=models.FileField(blank=True, null=True, upload_to='thumbnails/'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='pan_card_original',
+            field=models.FileField(blank=True, null=True, upload_to='originals/'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='pan_card_thumbnail',
+            field=models.FileField(blank=True, null=True, upload_to='thumbnails/'),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:45
+
+import re
+from collections import Counter
+
+from django.db import migrations, models
+
+
+# A frozen copy of candidates.facets as of this migration, so later changes
+# to the live normalization don't change what this backfill does.
+SKILL_SEPARATORS = re.compile(r'[,;|\n]+')
+WHITESPACE = re.compile(r'\s+')
+
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'java script': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'node js': 'node.js',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'amazon web services': 'aws',
+    'c sharp': 'c#',
+    'springboot': 'spring boot',
+}
+
+SKILL_LABELS = {
+    'javascript': 'JavaScript',
+    'typescript': 'TypeScript',
+    'python': 'Python',
+    'go': 'Go',
+    'react': 'React',
+    'node.js': 'Node.js',
+    'postgresql': 'PostgreSQL',
+    'kubernetes': 'Kubernetes',
+    'machine learning': 'Machine Learning',
+    'aws': 'AWS',
+    'c#': 'C#',
+    'spring boot': 'Spring Boot',
+}
+
+
+def normalize(value):
+    if not value:
+        return None
+    value = WHITESPACE.sub(' ', value).strip().strip('.').strip()
+    return value.casefold() or None
+
+
+def facet_values(skills, employer, designation):
+    values = {}
+    for raw in SKILL_SEPARATORS.split(skills or ''):
+        value = normalize(raw)
+        if value is None:
+            continue
+        value = SKILL_ALIASES.get(value, value)[:255]
+        values.setdefault(('skill', value), SKILL_LABELS.get(value) or WHITESPACE.sub(' ', raw).strip())
+    for kind, raw in (('employer', employer), ('designation', designation)):
+        value = normalize(raw)
+        if value is not None:
+            values[(kind, value[:255])] = WHITESPACE.sub(' ', raw).strip()
+    return values
+
+
+def backfill_facets(apps, schema_editor):
+    Candidate = apps.get_model('candidates', 'Candidate')
+    Facet = apps.get_model('candidates', 'Facet')
+
+    counts, labels = Counter(), {}
+    rows = Candidate.objects.values_list('skills', 'employer', 'designation').iterator(chunk_size=1000)
+    for skills, employer, designation in rows:
+        values = facet_values(skills, employer, designation)
+        counts.update(values.keys())
+        for key, label in values.items():
+            labels.setdefault(key, label)
+
+    Facet.objects.bulk_create(
+        [
+            Facet(kind=kind, value=value, label=labels[(kind, value)][:255], count=count)
+            for (kind, value), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0008_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Facet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('skill', 'Skill'), ('employer', 'Employer'), ('designation', 'Designation')], max_length=20)),
+                ('value', models.CharField(max_length=255)),
+                ('label', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['kind', '-count'],
+                'indexes': [models.Index(fields=['kind', '-count'], name='facet_kind_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'value'), name='unique_facet_kind_value')],
+            },
+        ),
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:04
+
+import re
+
+from django.db import migrations, models
+
+
+# Frozen copy of candidates.facets.normalize as of this migration
+WHITESPACE = re.compile(r'\s+')
+
+
+def employer_key(employer):
+    if not employer:
+        return None
+    value = WHITESPACE.sub(' ', employer).strip().strip('.').strip().casefold()
+    return value[:255] or None
+
+
+def backfill_employer_keys(apps, schema_editor):
+    Candidate = apps.get_model('candidates', 'Candidate')
+
+    batch = []
+    for candidate in Candidate.objects.exclude(employer=None).only('id', 'employer').iterator(chunk_size=1000):
+        candidate.employer_key = employer_key(candidate.employer)
+        batch.append(candidate)
+        if len(batch) == 1000:
+            Candidate.objects.bulk_update(batch, ['employer_key'])
+            batch = []
+    Candidate.objects.bulk_update(batch, ['employer_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0009_facet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='employer_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_employer_keys, migrations.RunPython.noop),
+    ]
@@ -6,19 +6,90 @@ class Candidate(models.Model):
     email = models.EmailField(max_length=255, blank=True, null=True)
     phone = models.CharField(max_length=255, blank=True, null=True)
     employer = models.CharField(max_length=255, blank=True, null=True)
+    # facets.normalize(employer), kept by the pre_save signal; matches Facet.value for employers
+    employer_key = models.CharField(max_length=255, blank=True, null=True, db_index=True, editable=False)
     designation = models.CharField(max_length=255, blank=True, null=True)
     skills = models.TextField(blank=True, null=True)
     confidence_scores = models.JSONField(blank=True, null=True)
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
     aadhar_card = models.FileField(upload_to='aadhar_cards/', blank=True, null=True)
     pan_card = models.FileField(upload_to='pan_cards/', blank=True, null=True)
+    aadhar_card_thumbnail = models.FileField(upload_to='thumbnails/', blank=True, null=True)
+    pan_card_thumbnail = models.FileField(upload_to='thumbnails/', blank=True, null=True)
+    # Untouched uploads, kept only when KEEP_ORIGINAL_DOCUMENTS is on
+    aadhar_card_original = models.FileField(upload_to='originals/', blank=True, null=True)
+    pan_card_original = models.FileField(upload_to='originals/', blank=True, null=True)
     document_request_message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True, blank=True, null=True)
-    updated_at = models.DateTimeField(auto_now=True, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, blank=True, null=True, db_index=True)
 
     # Added default sorting by created_at in descending order
     class Meta:
         ordering = ['-created_at']
 
     def __str__(self):
-        return self.name or ""
\ No newline at end of file
+        return self.name or ""
+
+class TableVersion(models.Model):
+    """Counter bumped on every write to a table, used to build cheap ETags and cache keys."""
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.name}@{self.version}"
+
+
+class StoredBlob(models.Model):
+    """Reference count for a content-addressed file kept by ContentAddressedStorage."""
+    name = models.CharField(max_length=255, primary_key=True)
+    size = models.BigIntegerField(default=0)
+    compressed = models.BooleanField(default=False)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
+
+
+class IdempotencyKey(models.Model):
+    """Stored outcome of a retried-prone request; a null response_status means it is still in flight."""
+    key = models.CharField(max_length=255, unique=True)
+    fingerprint = models.CharField(max_length=64, blank=True, default='')
+    response_status = models.PositiveSmallIntegerField(blank=True, null=True)
+    response_body = models.JSONField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.key
+
+
+class Facet(models.Model):
+    """Running count of candidates per normalized skill, employer or designation."""
+    SKILL = 'skill'
+    EMPLOYER = 'employer'
+    DESIGNATION = 'designation'
+    KIND_CHOICES = [
+        (SKILL, 'Skill'),
+        (EMPLOYER, 'Employer'),
+        (DESIGNATION, 'Designation'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    value = models.CharField(max_length=255)
+    label = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['kind', '-count']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value'], name='unique_facet_kind_value'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', '-count'], name='facet_kind_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.label} ({self.count})"
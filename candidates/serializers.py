@@ -16,7 +16,10 @@ class CandidateSerializer(serializers.ModelSerializer):
             'resume',
             'aadhar_card',
             'pan_card',
+            'aadhar_card_thumbnail',
+            'pan_card_thumbnail',
             'document_request_message',
             'created_at',
             'updated_at'
-        ]
\ No newline at end of file
+        ]
+        read_only_fields = ['aadhar_card_thumbnail', 'pan_card_thumbnail']
\ No newline at end of file
@@ -2,17 +2,40 @@ import os
 import json
 import re
 
-import PyPDF2
-import docx
-from anthropic import Anthropic
+# PyPDF2, python-docx and anthropic (with httpx/pydantic behind it) are
+# imported on first use, so workers and manage.py commands that never parse
+# a resume don't pay for them. See preload_dependencies() for the opposite.
+
+
+def preload_dependencies():
+    """
+    Import the heavy parsing/LLM/imaging modules up front.
+
+    Called from the gunicorn master (see gunicorn.conf.py) so forked workers
+    share these pages copy-on-write instead of each importing them.
+    """
+    import PyPDF2  # noqa: F401
+    import docx  # noqa: F401
+    import anthropic  # noqa: F401
+    from PIL import Image, ImageOps  # noqa: F401
+
+
+def anthropic_client():
+    """Anthropic client for the configured API key, or None when no key is set."""
+    anthropic_api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not anthropic_api_key:
+        return None
+    from anthropic import Anthropic
+    return Anthropic(api_key=anthropic_api_key)
 
 
 class ResumeParser:
     def __init__(self):
-        anthropic_api_key = os.getenv('ANTHROPIC_API_KEY')
-        self.anthropic = Anthropic(api_key=anthropic_api_key) if anthropic_api_key else None
+        self.anthropic = anthropic_client()
 
     def parse_pdf(self, resume_path):
+        import PyPDF2
+
         with open(resume_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             resume_text = ''
@@ -21,6 +44,8 @@ class ResumeParser:
             return resume_text
 
     def parse_docx(self, resume_path):
+        import docx
+
         with open(resume_path, 'rb') as file:
             docx_reader = docx.Document(file)
             resume_text = ''
@@ -29,6 +54,8 @@ class ResumeParser:
             return resume_text
 
     def parse_doc(self, resume_path):
+        import docx
+
         with open(resume_path, 'rb') as file:
             doc_reader = docx.Document(file)
             resume_text = ''
@@ -149,8 +176,7 @@ Return only the JSON object, no other text. Example format:
 
 class AIDocumentRequestGenerator:
     def __init__(self):
-        anthropic_api_key = os.getenv('ANTHROPIC_API_KEY')
-        self.anthropic = Anthropic(api_key=anthropic_api_key) if anthropic_api_key else None
+        self.anthropic = anthropic_client()
 
     def generate_request(self, candidate):
         """Generate a personalized document request message for a candidate."""
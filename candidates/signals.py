@@ -0,0 +1,100 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import FileField
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_table_version
+from .facets import FACET_FIELDS, apply_delta, candidate_facets, facet_key
+from .models import Candidate
+from .storage import release_file
+
+
+FILE_FIELDS = [field for field in Candidate._meta.get_fields() if isinstance(field, FileField)]
+
+
+def stored_files(instance):
+    """Counter of (storage, name) pairs currently referenced by a candidate."""
+    return Counter(
+        (field.storage, getattr(instance, field.attname).name)
+        for field in FILE_FIELDS
+        if getattr(instance, field.attname)
+    )
+
+
+def release_files(files):
+    """Give each file reference back to its storage once the surrounding transaction commits."""
+    def release():
+        for (storage, name), count in files.items():
+            for _ in range(count):
+                release_file(storage, name)
+
+    if files:
+        transaction.on_commit(release)
+
+
+@receiver(pre_save, sender=Candidate)
+def remember_previous_state(sender, instance, **kwargs):
+    """Snapshot the stored files and facet values this save is about to change."""
+    instance._stored_files = Counter()
+    instance._facets = {}
+    if instance.pk:
+        previous = (
+            Candidate.objects
+            .only(*[field.attname for field in FILE_FIELDS], *FACET_FIELDS)
+            .filter(pk=instance.pk)
+            .first()
+        )
+        if previous is not None:
+            instance._stored_files = stored_files(previous)
+            instance._facets = candidate_facets(previous)
+
+
+@receiver(pre_save, sender=Candidate)
+def set_employer_key(sender, instance, **kwargs):
+    instance.employer_key = facet_key(instance.employer)
+
+
+@receiver(post_save, sender=Candidate)
+def save_employer_key(sender, instance, update_fields=None, **kwargs):
+    """save(update_fields=[..., 'employer']) wouldn't write the key set above; do it here."""
+    if update_fields and 'employer' in update_fields and 'employer_key' not in update_fields:
+        Candidate.objects.filter(pk=instance.pk).update(employer_key=instance.employer_key)
+
+
+@receiver(post_save, sender=Candidate)
+def release_replaced_files(sender, instance, **kwargs):
+    """Files that were swapped out by this save (e.g. a re-uploaded PAN card) lose a reference."""
+    previous = getattr(instance, '_stored_files', Counter())
+    release_files(previous - stored_files(instance))
+    instance._stored_files = Counter()
+
+
+@receiver(post_delete, sender=Candidate)
+def release_deleted_files(sender, instance, **kwargs):
+    release_files(stored_files(instance))
+
+
+@receiver(post_save, sender=Candidate)
+def update_facets(sender, instance, **kwargs):
+    apply_delta(getattr(instance, '_facets', {}), candidate_facets(instance))
+    instance._facets = {}
+
+
+@receiver(post_delete, sender=Candidate)
+def remove_from_facets(sender, instance, **kwargs):
+    apply_delta(candidate_facets(instance), {})
+
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def invalidate_candidate_cache(sender, instance, **kwargs):
+    """
+    Any write changes the table version, which retires cached list payloads.
+
+    Detail payloads are keyed on the row's `updated_at` instead and do not
+    see the version, so writes must keep `updated_at` current (include it
+    in update_fields) for detail responses to refresh.
+    """
+    bump_table_version()
@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import os
+import struct
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+
+# Text-like uploads are gzipped on disk; PDFs, DOCX files and images are
+# already compressed and are stored as-is.
+COMPRESSIBLE_EXTENSIONS = {'.txt', '.rtf', '.csv', '.json', '.xml', '.html', '.htm', '.md', '.svg'}
+
+BLOB_PREFIX = 'blobs'
+
+
+def content_digest(content):
+    """SHA-256 of an uploaded file, read in chunks so large files are never fully in memory."""
+    sha = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        sha.update(chunk)
+    content.seek(0)
+    return sha.hexdigest()
+
+
+def release_file(storage, name):
+    """Drop one reference to a stored file; plain storages just delete it."""
+    if hasattr(storage, 'release'):
+        storage.release(name)
+    else:
+        storage.delete(name)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names every file by the SHA-256 of its contents.
+
+    Identical uploads share a single file under `blobs/`, tracked by a
+    StoredBlob row whose refcount goes up on every save and down on every
+    release(); the bytes are removed only when the last reference goes away.
+    References are released in one place only, by the Candidate save/delete
+    signals (and the document pipeline for files it never attached), so
+    delete() leaves shared blobs alone. Files saved before this storage was
+    enabled keep their original names and behave as with FileSystemStorage.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content in _save, so there is nothing to disambiguate.
+        return name
+
+    def blob_name(self, digest, name):
+        ext = os.path.splitext(name)[1].lower()
+        return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+    def is_compressed(self, name):
+        return not os.path.exists(self.path(name)) and os.path.exists(self.path(name) + '.gz')
+
+    def _save(self, name, content):
+        from .models import StoredBlob
+
+        digest = content_digest(content)
+        name = self.blob_name(digest, name)
+        compress = os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS
+
+        with transaction.atomic():
+            blob, created = StoredBlob.objects.select_for_update().get_or_create(
+                name=name,
+                defaults={'compressed': compress},
+            )
+            if created or not self.exists(name):
+                blob.size = self._write_blob(name, content, compress)
+                blob.compressed = compress
+                blob.save(update_fields=['size', 'compressed'])
+            StoredBlob.objects.filter(pk=name).update(refcount=F('refcount') + 1)
+
+        return name
+
+    def _write_blob(self, name, content, compress):
+        """Write to a temp file next to the target and rename it into place atomically."""
+        target = self.path(name) + ('.gz' if compress else '')
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                destination = gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) if compress else raw
+                content.seek(0)
+                for chunk in content.chunks():
+                    destination.write(chunk)
+                    size += len(chunk)
+                if compress:
+                    destination.close()
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return size
+
+    def _open(self, name, mode='rb'):
+        if self.is_compressed(name):
+            file = File(gzip.open(self.path(name) + '.gz', mode), name)
+            file.size = self.size(name)
+            return file
+        return super()._open(name, mode)
+
+    def exists(self, name):
+        return super().exists(name) or os.path.lexists(self.path(name) + '.gz')
+
+    def size(self, name):
+        if self.is_compressed(name):
+            # The gzip trailer stores the uncompressed length modulo 2**32.
+            with open(self.path(name) + '.gz', 'rb') as file:
+                file.seek(-4, os.SEEK_END)
+                return struct.unpack('<I', file.read(4))[0]
+        return super().size(name)
+
+    def delete(self, name):
+        """
+        Only deletes files that aren't content-addressed.
+
+        FieldFile.delete() calls this and then saves the instance, whose
+        post_save signal releases the reference; dropping it here as well
+        would release one blob reference twice.
+        """
+        from .models import StoredBlob
+
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        if not StoredBlob.objects.filter(pk=name).exists():
+            super().delete(name)
+
+    def release(self, name):
+        """Drop one reference to a blob, removing the file with the last one."""
+        from .models import StoredBlob
+
+        if not name:
+            raise ValueError('The name must be given to release().')
+
+        with transaction.atomic():
+            blob = StoredBlob.objects.select_for_update().filter(pk=name).first()
+            if blob is None:
+                # Not content-addressed (saved before this storage was enabled).
+                return super().delete(name)
+            if blob.refcount > 1:
+                StoredBlob.objects.filter(pk=name).update(refcount=F('refcount') - 1)
+                return
+            blob.delete()
+            for path in (self.path(name), self.path(name) + '.gz'):
+                if os.path.exists(path):
+                    os.remove(path)
@@ -1,3 +1,512 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from . import documents, idempotency
+from .admin import EmployerFacetFilter
+from .admission import AdmissionPool, ServiceUnavailable
+from .documents import normalize_documents
+from .facets import rebuild_facets
+from .models import Candidate, Facet, IdempotencyKey, StoredBlob
+from .serializers import CandidateSerializer
+
+
+class MediaRootMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp(prefix='autoparse-test-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ExportTests(TestCase):
+    def test_invalid_since_is_rejected(self):
+        for since in ('yesterday', '2024-13-01T00:00:00'):
+            response = self.client.get('/api/candidates/export/', {'since': since}, secure=True)
+            self.assertEqual(response.status_code, 400, since)
+
+    def test_since_without_offset_is_read_as_utc(self):
+        candidate = Candidate.objects.create(name='Recent')
+        Candidate.objects.filter(pk=candidate.pk).update(updated_at=datetime(2024, 1, 2, tzinfo=dt_timezone.utc))
+        Candidate.objects.create(name='Old')
+        Candidate.objects.exclude(pk=candidate.pk).update(updated_at=datetime(2023, 12, 31, tzinfo=dt_timezone.utc))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            response = self.client.get('/api/candidates/export/', {'since': '2024-01-01'}, secure=True)
+            rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in rows], [candidate.pk])
+
+
+class ConditionalReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.candidate = Candidate.objects.create(name='Priya Iyer', employer='Acme')
+
+    def get(self, path, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(path, secure=True, **headers)
+
+    def detail_path(self, candidate=None):
+        return f'/api/candidates/{(candidate or self.candidate).pk}/'
+
+    def test_unchanged_list_and_detail_answer_304(self):
+        for path in ('/api/candidates/', self.detail_path()):
+            first = self.get(path)
+            self.assertEqual(first.status_code, 200)
+
+            second = self.get(path, first['ETag'])
+            self.assertEqual(second.status_code, 304, path)
+            self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_save_changes_the_etag_and_payload(self):
+        list_before, detail_before = self.get('/api/candidates/'), self.get(self.detail_path())
+
+        self.candidate.name = 'Priya Menon'
+        self.candidate.save()
+
+        list_after = self.get('/api/candidates/', list_before['ETag'])
+        detail_after = self.get(self.detail_path(), detail_before['ETag'])
+        self.assertEqual(list_after.status_code, 200)
+        self.assertNotEqual(list_after['ETag'], list_before['ETag'])
+        self.assertEqual(list_after.json()[0]['name'], 'Priya Menon')
+        self.assertEqual(detail_after.status_code, 200)
+        self.assertNotEqual(detail_after['ETag'], detail_before['ETag'])
+        self.assertEqual(detail_after.json()['name'], 'Priya Menon')
+
+    def test_delete_changes_the_list(self):
+        other = Candidate.objects.create(name='Rohan Das')
+        before = self.get('/api/candidates/')
+        self.assertEqual(len(before.json()), 2)
+
+        other.delete()
+
+        after = self.get('/api/candidates/', before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual([row['id'] for row in after.json()], [self.candidate.pk])
+        self.assertEqual(self.get(self.detail_path(other)).status_code, 404)
+
+    def test_detail_refreshes_after_partial_save(self):
+        before = self.get(self.detail_path())
+        # As the document pipeline does: only the changed fields plus updated_at
+        candidate = Candidate.objects.get(pk=self.candidate.pk)
+        candidate.document_request_message = 'Please send your PAN card'
+        candidate.save(update_fields=['document_request_message', 'updated_at'])
+
+        after = self.get(self.detail_path(), before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.json()['document_request_message'], 'Please send your PAN card')
+
+
+class ContentAddressedStorageTests(MediaRootMixin, TestCase):
+    def create_with_resume(self, content):
+        candidate = Candidate.objects.create(name='Test')
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate.resume.save('resume.pdf', ContentFile(content), save=True)
+        return candidate
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.create_with_resume(b'same bytes')
+        second = self.create_with_resume(b'same bytes')
+
+        self.assertEqual(first.resume.name, second.resume.name)
+        self.assertEqual(StoredBlob.objects.get(pk=first.resume.name).refcount, 2)
+
+    def test_replacing_a_file_releases_the_old_blob(self):
+        first = self.create_with_resume(b'old bytes')
+        second = self.create_with_resume(b'old bytes')
+        old_name = first.resume.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.resume.save('resume.pdf', ContentFile(b'new bytes'), save=True)
+
+        self.assertEqual(StoredBlob.objects.get(pk=old_name).refcount, 1)
+        self.assertEqual(StoredBlob.objects.get(pk=first.resume.name).refcount, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.resume.save('resume.pdf', ContentFile(b'newer bytes'), save=True)
+
+        self.assertFalse(StoredBlob.objects.filter(pk=old_name).exists())
+        self.assertFalse(default_storage.exists(old_name))
+
+    def test_deleting_candidates_removes_the_blob_with_the_last_reference(self):
+        first = self.create_with_resume(b'shared')
+        second = self.create_with_resume(b'shared')
+        name = first.resume.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(StoredBlob.objects.get(pk=name).refcount, 1)
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(StoredBlob.objects.filter(pk=name).exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_field_file_delete_releases_one_reference(self):
+        first, second, third = (self.create_with_resume(b'shared resume') for _ in range(3))
+        name = first.resume.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.resume.delete()
+        self.assertEqual(StoredBlob.objects.get(pk=name).refcount, 2)
+        self.assertFalse(Candidate.objects.get(pk=first.pk).resume)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.resume.delete()
+        self.assertEqual(StoredBlob.objects.get(pk=name).refcount, 1)
+        with third.resume.open('rb') as file:
+            self.assertEqual(file.read(), b'shared resume')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            third.resume.delete()
+        self.assertFalse(StoredBlob.objects.filter(pk=name).exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_blobs_are_not_cacheable_by_shared_caches(self):
+        candidate = self.create_with_resume(b'%PDF- identity document')
+
+        response = self.client.get('/media/' + candidate.resume.name, secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+
+
+@override_settings(DOCUMENT_IMAGE_MAX_SIZE=200, DOCUMENT_THUMBNAIL_SIZE=50, DOCUMENT_IMAGE_FORMAT='WEBP')
+class DocumentPipelineTests(MediaRootMixin, TestCase):
+    def photo(self, color='red'):
+        """A 600x400 JPEG with camera EXIF saying it must be rotated to portrait."""
+        exif = Image.Exif()
+        exif[0x0110] = 'Test Camera'  # Model
+        exif[0x0112] = 6  # Orientation: rotate 90 CW
+        output = io.BytesIO()
+        Image.new('RGB', (600, 400), color).save(output, format='JPEG', exif=exif)
+        return ContentFile(output.getvalue(), name='pan.jpg')
+
+    def candidate_with_pan(self):
+        candidate = Candidate.objects.create(name='Test')
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate.pan_card.save('pan.jpg', self.photo(), save=True)
+        return candidate
+
+    def normalize(self, candidate):
+        with self.captureOnCommitCallbacks(execute=True):
+            normalize_documents(candidate.pk, ['pan_card'])
+        return Candidate.objects.get(pk=candidate.pk)
+
+    def test_photo_is_downscaled_without_metadata(self):
+        candidate = self.normalize(self.candidate_with_pan())
+
+        self.assertTrue(candidate.pan_card.name.endswith('.webp'))
+        with candidate.pan_card.open('rb') as file, Image.open(file) as image:
+            self.assertLessEqual(max(image.size), 200)
+            # Orientation was applied before the EXIF block was dropped
+            self.assertGreater(image.height, image.width)
+            self.assertEqual(len(image.getexif()), 0)
+
+    def test_thumbnail_is_set_and_serialized(self):
+        candidate = self.normalize(self.candidate_with_pan())
+
+        with candidate.pan_card_thumbnail.open('rb') as file, Image.open(file) as image:
+            self.assertLessEqual(max(image.size), 50)
+        data = CandidateSerializer(candidate).data
+        self.assertEqual(data['pan_card_thumbnail'], candidate.pan_card_thumbnail.url)
+
+    def test_original_is_released_by_default(self):
+        candidate = self.candidate_with_pan()
+        original = candidate.pan_card.name
+
+        candidate = self.normalize(candidate)
+
+        self.assertFalse(candidate.pan_card_original)
+        self.assertFalse(StoredBlob.objects.filter(pk=original).exists())
+        self.assertFalse(default_storage.exists(original))
+
+    @override_settings(KEEP_ORIGINAL_DOCUMENTS=True)
+    def test_original_is_kept_when_configured(self):
+        candidate = self.candidate_with_pan()
+        original = candidate.pan_card.name
+
+        candidate = self.normalize(candidate)
+
+        self.assertEqual(candidate.pan_card_original.name, original)
+        self.assertEqual(StoredBlob.objects.get(pk=original).refcount, 1)
+
+    def test_card_replaced_during_the_job_is_left_alone(self):
+        candidate = self.candidate_with_pan()
+        original_normalize_image = documents.normalize_image
+
+        def replace_then_normalize(file):
+            result = original_normalize_image(file)
+            # A newer upload lands while the job is encoding
+            newer = Candidate.objects.get(pk=candidate.pk)
+            newer.pan_card.save('pan.jpg', self.photo('blue'), save=True)
+            return result
+
+        with mock.patch('candidates.documents.normalize_image', side_effect=replace_then_normalize):
+            replaced = self.normalize(candidate)
+
+        newer_upload = replaced.pan_card.name
+        self.assertTrue(newer_upload.endswith('.jpg'))
+        self.assertFalse(replaced.pan_card_thumbnail)
+        # Only the newer upload is left; the job's outputs and the first upload are gone
+        self.assertEqual(list(StoredBlob.objects.values_list('name', 'refcount')), [(newer_upload, 1)])
+
+
+class IdempotencyTests(MediaRootMixin, TestCase):
+    parsed = {'name': 'Priya Iyer', 'email': 'priya@example.com', 'skills': 'Python'}
+
+    def upload(self, content, key=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                '/api/candidates/upload/',
+                {'resume': SimpleUploadedFile('resume.pdf', content)},
+                secure=True, **headers,
+            )
+
+    @mock.patch('candidates.views.ResumeParser.parse_resume', return_value=parsed)
+    def test_retry_with_the_same_key_is_replayed(self, parse_resume):
+        first = self.upload(b'%PDF- one', key='retry-1')
+        second = self.upload(b'%PDF- one', key='retry-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json()['id'], first.json()['id'])
+        self.assertEqual(parse_resume.call_count, 1)
+        self.assertEqual(Candidate.objects.count(), 1)
+
+    @mock.patch('candidates.views.ResumeParser.parse_resume', return_value=parsed)
+    def test_reusing_a_key_for_another_file_is_rejected(self, parse_resume):
+        self.upload(b'%PDF- one', key='retry-2')
+        response = self.upload(b'%PDF- two', key='retry-2')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(parse_resume.call_count, 1)
+
+    def test_server_errors_are_not_stored(self):
+        results = iter([(500, {'error': 'boom'}), (201, {'id': 1})])
+
+        self.assertEqual(idempotency.execute('k', 'f', lambda: next(results), 60), (500, {'error': 'boom'}, False))
+        self.assertEqual(idempotency.execute('k', 'f', lambda: next(results), 60), (201, {'id': 1}, False))
+        self.assertEqual(idempotency.execute('k', 'f', lambda: (418, {}), 60), (201, {'id': 1}, True))
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0.35)
+    def test_waiting_on_another_process_only_reads(self):
+        # A row claimed by some other worker that never finishes
+        IdempotencyKey.objects.create(key='busy', fingerprint='f', expires_at=timezone.now() + timedelta(minutes=5))
+
+        with mock.patch('candidates.idempotency.claim', wraps=idempotency.claim) as claim:
+            with self.assertRaises(idempotency.IdempotencyTimeout):
+                idempotency.execute('busy', 'f', lambda: (200, {}), 60)
+
+        self.assertEqual(claim.call_count, 1)
+
+    def test_abandoned_claims_are_taken_over(self):
+        IdempotencyKey.objects.create(key='stale', fingerprint='f', expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(idempotency.execute('stale', 'f', lambda: (200, {'ok': True}), 60), (200, {'ok': True}, False))
+
+
+class CoalescingTests(TransactionTestCase):
+    def test_overlapping_identical_requests_share_one_execution(self):
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.3)
+            return 201, {'id': 7}
+
+        def request(wait_for=None):
+            if wait_for is not None:
+                wait_for.wait(5)
+            try:
+                return idempotency.execute('upload:content:abc', 'abc', compute, 5)
+            finally:
+                connections.close_all()
+
+        # One duplicate: the in-memory test database can't take concurrent writers
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(request)
+            duplicate = pool.submit(request, started)
+            results = [first.result(), duplicate.result()]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [(201, {'id': 7}, False), (201, {'id': 7}, True)])
+
+
+class AdmissionPoolTests(TestCase):
+    def make_pool(self, **options):
+        return AdmissionPool('test', **{'concurrency': 1, 'queue': 1, 'timeout': 5, 'retry_after': 3, **options})
+
+    def test_requests_beyond_the_queue_are_rejected(self):
+        pool = self.make_pool()
+        pool.acquire()
+        waiter = threading.Thread(target=pool.acquire)
+        waiter.start()
+        while not pool.waiting:
+            time.sleep(0.01)
+
+        with self.assertRaises(ServiceUnavailable) as raised:
+            pool.acquire()
+        self.assertEqual(raised.exception.wait, 3)
+        self.assertEqual(pool.rejected['queue_full'], 1)
+
+        pool.release()
+        waiter.join(5)
+        self.assertEqual(pool.active, 1)
+
+    def test_queued_requests_time_out(self):
+        pool = self.make_pool(timeout=0.05)
+        pool.acquire()
+
+        with self.assertRaises(ServiceUnavailable):
+            pool.acquire()
+        self.assertEqual(pool.rejected['timeout'], 1)
+        self.assertEqual(pool.waiting, 0)
+
+    def test_default_pools_fit_in_the_worker_threads(self):
+        slots = sum(pool['concurrency'] + pool['queue'] for pool in settings.ADMISSION_POOLS.values())
+        expensive = settings.ADMISSION_POOLS['expensive']
+
+        self.assertLessEqual(slots, settings.GUNICORN_THREADS)
+        self.assertLess(expensive['concurrency'] + expensive['queue'], settings.GUNICORN_THREADS)
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=120)
+    def test_duplicates_wait_no_longer_than_the_pool_timeout(self):
+        IdempotencyKey.objects.create(
+            key='upload:content:held', fingerprint='held', expires_at=timezone.now() + timedelta(minutes=5)
+        )
+        request = RequestFactory().post('/api/candidates/upload/')
+
+        start = time.monotonic()
+        response = idempotency.idempotent_response(
+            request, 'upload', 'held', lambda: None, coalesce_key='held', wait_timeout=0.2
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertLess(time.monotonic() - start, 5)
+
+
+@override_settings(
+    THROTTLE_BUCKETS={'expensive': {'rate': 0.001, 'burst': 2}, 'cheap': {'rate': 0.001, 'burst': 2}},
+)
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def statuses(self, header_sets):
+        return [
+            self.client.get('/api/candidates/facets/', secure=True, **headers).status_code
+            for headers in header_sets
+        ]
+
+    def test_clients_are_limited_to_their_burst(self):
+        self.assertEqual(self.statuses([{}] * 3), [200, 200, 429])
+
+        response = self.client.get('/api/candidates/facets/', secure=True)
+        self.assertIn('Retry-After', response)
+
+    def test_unverified_authorization_headers_share_the_ip_bucket(self):
+        headers = [{'HTTP_AUTHORIZATION': f'Bearer {uuid.uuid4()}'} for _ in range(4)]
+
+        self.assertEqual(self.statuses(headers), [200, 200, 429, 429])
+
+    def test_spoofed_forwarded_for_is_ignored(self):
+        # The proxy appends the address it saw; anything before it came from the client
+        headers = [{'HTTP_X_FORWARDED_FOR': f'10.0.0.{index}, 203.0.113.7'} for index in range(4)]
+
+        self.assertEqual(self.statuses(headers), [200, 200, 429, 429])
+        self.assertEqual(self.statuses([{'HTTP_X_FORWARDED_FOR': '10.0.0.1, 203.0.113.8'}]), [200])
+
+
+class FacetTests(TestCase):
+    def counts(self):
+        return {(facet.kind, facet.value): facet.count for facet in Facet.objects.all()}
+
+    def test_incremental_counts_match_a_rebuild(self):
+        first = Candidate.objects.create(skills='Python, JS, Django', employer='Acme  Inc.', designation='Engineer')
+        second = Candidate.objects.create(skills='python3, React', employer='acme inc', designation='engineer')
+        Candidate.objects.create(skills='Go', employer='Zoho')
+
+        first.skills = 'Python, TypeScript'
+        first.employer = 'Zoho'
+        first.save()
+        second.delete()
+
+        incremental = self.counts()
+        rebuild_facets()
+        self.assertEqual(incremental, self.counts())
+        self.assertEqual(incremental[(Facet.SKILL, 'python')], 1)
+        self.assertEqual(incremental[(Facet.EMPLOYER, 'zoho')], 2)
+        self.assertNotIn((Facet.EMPLOYER, 'acme inc'), incremental)
+        self.assertNotIn((Facet.SKILL, 'javascript'), incremental)
+
+    def test_aliased_skills_use_the_canonical_label(self):
+        Candidate.objects.create(skills='JS, k8s')
+        Candidate.objects.create(skills='javascript')
+
+        facet = Facet.objects.get(kind=Facet.SKILL, value='javascript')
+        self.assertEqual((facet.label, facet.count), ('JavaScript', 2))
+        self.assertEqual(Facet.objects.get(kind=Facet.SKILL, value='kubernetes').label, 'Kubernetes')
+
+    def test_employer_filter_matches_the_normalized_counts(self):
+        Candidate.objects.create(employer='Acme Inc.')
+        Candidate.objects.create(employer='  ACME   inc ')
+        Candidate.objects.create(employer='Acme Industries')
+        facet = Facet.objects.get(kind=Facet.EMPLOYER, value='acme inc')
+
+        request = RequestFactory().get('/admin/candidates/candidate/')
+        model_admin = admin.site._registry[Candidate]
+        list_filter = EmployerFacetFilter(request, {'employer_facet': [facet.value]}, Candidate, model_admin)
+
+        self.assertEqual(list_filter.queryset(request, Candidate.objects.all()).count(), facet.count)
+
+    def test_employer_filter_uses_the_stored_key(self):
+        candidate = Candidate.objects.create(employer='Acme')
+        candidate.employer = ' Zoho Corp. '
+        candidate.save(update_fields=['employer'])
+
+        self.assertEqual(Candidate.objects.get(pk=candidate.pk).employer_key, 'zoho corp')
+
+        request = RequestFactory().get('/admin/candidates/candidate/')
+        model_admin = admin.site._registry[Candidate]
+        list_filter = EmployerFacetFilter(request, {'employer_facet': ['zoho corp']}, Candidate, model_admin)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(list_filter.queryset(request, Candidate.objects.all())), [candidate])
+
+    def test_negative_limit_returns_no_facets(self):
+        Candidate.objects.create(skills='Python', employer='Acme', designation='Engineer')
+
+        response = self.client.get('/api/candidates/facets/', {'limit': -5}, secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'skills': [], 'employers': [], 'designations': []})
@@ -6,20 +6,113 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
 from django.core.files.storage import default_storage
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
-from .models import Candidate
+from .admission import (
+    AdmissionControlMixin, CheapRateThrottle, ExpensiveRateThrottle, pool_name_for, render_metrics,
+)
+from .models import Candidate, Facet
 from .serializers import CandidateSerializer
+from .caching import cached_response, get_table_version, make_etag
+from .documents import schedule_normalization
+from .exports import export_queryset, stream_csv, stream_ndjson
+from .facets import top_facets
+from .idempotency import idempotent_response
 from .services import ResumeParser, AIDocumentRequestGenerator
+from .storage import content_digest
+
+def metrics(request):
+    """Prometheus metrics for this worker's admission control."""
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4')
+
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CandidateViewSet(viewsets.ModelViewSet):
+class CandidateViewSet(AdmissionControlMixin, viewsets.ModelViewSet):
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
     authentication_classes = []
     permission_classes = [AllowAny]
 
+    def get_throttles(self):
+        if pool_name_for(self.action) == 'expensive':
+            return [ExpensiveRateThrottle()]
+        return [CheapRateThrottle()]
+
+    def list(self, request, *args, **kwargs):
+        """List candidates, answering 304 or a cached payload while the table is unchanged."""
+        version, last_modified = get_table_version()
+        etag = make_etag(request, 'list', version)
+
+        def build_payload():
+            queryset = self.filter_queryset(self.get_queryset())
+            return self.get_serializer(queryset, many=True).data
+
+        return cached_response(request, etag, last_modified, build_payload, Response)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return one candidate, answering 304 or a cached payload while `updated_at` is unchanged."""
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            updated_at = Candidate.objects.filter(pk=lookup).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError):
+            updated_at = None
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = make_etag(request, 'detail', lookup, updated_at.isoformat())
+
+        def build_payload():
+            return self.get_serializer(self.get_object()).data
+
+        return cached_response(request, etag, updated_at, build_payload, Response)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        """Stream every candidate as NDJSON (default) or CSV, optionally only those updated after `since`."""
+        output = request.query_params.get('output', 'ndjson').lower()
+        if output not in ('ndjson', 'csv'):
+            return Response({'error': 'output must be one of: ndjson, csv'}, status=status.HTTP_400_BAD_REQUEST)
+
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                # Well-formed but impossible, e.g. month 13
+                since = None
+            if since is None:
+                return Response({'error': 'since must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                # Dates without an offset are read in TIME_ZONE (UTC)
+                since = timezone.make_aware(since)
+
+        queryset = export_queryset(Candidate.objects.all(), since=since)
+
+        if output == 'csv':
+            response = StreamingHttpResponse(stream_csv(queryset, request), content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="candidates.csv"'
+        else:
+            response = StreamingHttpResponse(stream_ndjson(queryset, request), content_type='application/x-ndjson')
+        return response
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request, *args, **kwargs):
+        """Most common skills, employers and designations, read from the maintained facet counts."""
+        try:
+            limit = max(0, min(int(request.query_params.get('limit', 20)), 200))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'skills': top_facets(Facet.SKILL, limit),
+            'employers': top_facets(Facet.EMPLOYER, limit),
+            'designations': top_facets(Facet.DESIGNATION, limit),
+        }, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['post'])
     def upload(self, request, *args, **kwargs):
         resume_file = request.FILES.get('resume')
@@ -27,6 +120,16 @@ class CandidateViewSet(viewsets.ModelViewSet):
         if not resume_file:
             return Response({'error': 'Resume file is required'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Retries (same Idempotency-Key) and overlapping uploads of the same file share one parse
+        digest = content_digest(resume_file)
+        return idempotent_response(
+            request, 'upload', digest,
+            lambda: self.process_upload(resume_file),
+            coalesce_key=digest,
+            wait_timeout=self.admission_timeout,
+        )
+
+    def process_upload(self, resume_file):
         try:
             # Create temp directory if it doesn't exist
             from django.conf import settings
@@ -83,6 +186,14 @@ class CandidateViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='request-documents')
     def request_documents(self, request, pk=None):
         """Generating and logging a personalized request for PAN/Aadhaar documents."""
+        return idempotent_response(
+            request, 'request-documents', str(pk),
+            self.generate_document_request,
+            coalesce_key=str(pk),
+            wait_timeout=self.admission_timeout,
+        )
+
+    def generate_document_request(self):
         try:
             candidate = self.get_object()
             
@@ -119,11 +230,19 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 
                 if pan_card:
                     candidate.pan_card = pan_card
+                    candidate.pan_card_thumbnail = None
                 
                 if aadhar_card:
                     candidate.aadhar_card = aadhar_card
+                    candidate.aadhar_card_thumbnail = None
                 
                 candidate.save()
+
+                # Downscaling, EXIF stripping and thumbnails happen off the request thread
+                schedule_normalization(candidate.id, [
+                    field for field, uploaded in (('pan_card', pan_card), ('aadhar_card', aadhar_card))
+                    if uploaded
+                ])
                 
                 serializer = self.get_serializer(candidate)
                 
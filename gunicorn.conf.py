@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration (picked up automatically from the working directory).
+
+With preloading on (the default), the Django app and the heavy resume
+parsing / LLM / imaging libraries are imported once in the master process,
+and forked workers share those pages copy-on-write instead of each paying
+the import time and memory. Set GUNICORN_PRELOAD=False to load everything
+lazily per worker instead (e.g. to pick up code changes on HUP).
+"""
+import gc
+import os
+
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() in ('true', '1', 't')
+
+# Threaded workers, so each worker's admission pools (candidates/admission.py)
+# can run cheap reads alongside a slow upload instead of blocking on it. The
+# default ADMISSION_POOLS are sized from the same variable and default.
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+
+def on_starting(server):
+    if not preload_app:
+        return
+
+    from candidates.services import preload_dependencies
+    preload_dependencies()
+
+    # Move everything imported so far out of the GC's reach, so collections in
+    # the workers don't touch (and un-share) these pages.
+    gc.freeze()